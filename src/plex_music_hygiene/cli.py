@@ -1,23 +1,24 @@
 #!/usr/bin/env python3
+# Keep module-level imports to what argparse and --help need. Heavier modules
+# (urllib.request, xml.etree, csv, sqlite3, mutagen, ...) are imported inside
+# the functions that use them so each subcommand only pays for its own deps;
+# tests/test_startup.py guards this.
 import argparse
-import csv
-import io
-import getpass
-import mimetypes
+import functools
 import os
 import re
 import sys
 import time
-import urllib.parse
-import urllib.request
-import xml.etree.ElementTree as ET
 from collections import Counter
-from pathlib import Path
 
-try:
-    from mutagen import File as MutagenFile
-except Exception:
-    MutagenFile = None
+
+def mutagen_file():
+    """Return ``mutagen.File``, or None when mutagen is not installed."""
+    try:
+        from mutagen import File
+    except Exception:
+        return None
+    return File
 
 
 def eprint(*args):
@@ -71,6 +72,8 @@ def prompt_input(label, default="", secret=False):
         prompt += f" [{default}]"
     prompt += ": "
     if secret:
+        import getpass
+
         v = getpass.getpass(prompt)
     else:
         v = input(prompt)
@@ -88,57 +91,184 @@ def prompt_yes_no(label, default_yes=True):
     return v in ("y", "yes")
 
 
+@functools.lru_cache(maxsize=None)
+def xml_fromstring():
+    """Pick the XML parser once: lxml when installed (HF_XML_BACKEND=stdlib opts out)."""
+    if os.getenv("HF_XML_BACKEND", "auto") != "stdlib":
+        try:
+            import threading
+
+            from lxml import etree
+
+            # lxml 4.x resolves external entities by default; server responses never need them.
+            # One parser per thread: a shared lxml parser serialises the fetch workers.
+            local = threading.local()
+
+            def fromstring(data):
+                parser = getattr(local, "parser", None)
+                if parser is None:
+                    parser = local.parser = etree.XMLParser(resolve_entities=False, no_network=True)
+                return etree.fromstring(data, parser=parser)
+
+            return fromstring
+        except ImportError:
+            pass
+    import xml.etree.ElementTree as ET
+
+    return ET.fromstring
+
+
 class PlexClient:
-    def __init__(self, base_url: str, token: str, timeout: int = 60):
+    def __init__(self, base_url: str, token: str, timeout: int = 60, api_format: str = "xml"):
         self.base_url = base_url.rstrip("/")
         self.token = token
         self.timeout = timeout
+        self.api_format = api_format
 
     def _url(self, path: str, params=None):
+        import urllib.parse
+
         p = dict(params or {})
         p["X-Plex-Token"] = self.token
         return f"{self.base_url}{path}?{urllib.parse.urlencode(p)}"
 
+    def _open(self, path: str, params=None, method: str = "GET", data=None, headers=None):
+        import urllib.request
+
+        req = urllib.request.Request(self._url(path, params), data=data, method=method, headers=headers or {})
+        with urllib.request.urlopen(req, timeout=self.timeout) as r:
+            return r.read()
+
     def get_xml(self, path: str, params=None):
-        with urllib.request.urlopen(self._url(path, params), timeout=self.timeout) as r:
-            return ET.fromstring(r.read())
+        return xml_fromstring()(self._open(path, params))
+
+    def get_json(self, path: str, params=None):
+        import json
+
+        return json.loads(self._open(path, params, headers={"Accept": "application/json"})).get("MediaContainer", {})
 
     def get_bytes(self, path: str, params=None):
-        with urllib.request.urlopen(self._url(path, params), timeout=self.timeout) as r:
-            return r.read()
+        return self._open(path, params)
 
     def get(self, path: str, params=None):
-        req = urllib.request.Request(self._url(path, params), method="GET")
-        with urllib.request.urlopen(req, timeout=self.timeout) as r:
-            return r.read()
+        return self._open(path, params)
 
     def put(self, path: str, params=None):
-        req = urllib.request.Request(self._url(path, params), method="PUT")
-        with urllib.request.urlopen(req, timeout=self.timeout) as r:
-            return r.read()
+        return self._open(path, params, method="PUT")
 
     def delete(self, path: str, params=None):
-        req = urllib.request.Request(self._url(path, params), method="DELETE")
-        with urllib.request.urlopen(req, timeout=self.timeout) as r:
-            return r.read()
+        return self._open(path, params, method="DELETE")
 
     def post_url_poster(self, artist_id: str, source_url: str):
-        params = {"url": source_url}
-        req = urllib.request.Request(self._url(f"/library/metadata/{artist_id}/posters", params), method="POST")
-        with urllib.request.urlopen(req, timeout=self.timeout) as r:
-            return r.read()
+        return self._open(f"/library/metadata/{artist_id}/posters", {"url": source_url}, method="POST")
 
     def post_raw_poster(self, artist_id: str, image_path: str):
+        import mimetypes
+
         ctype = mimetypes.guess_type(image_path)[0] or "application/octet-stream"
-        data = Path(image_path).read_bytes()
-        req = urllib.request.Request(
-            self._url(f"/library/metadata/{artist_id}/posters"),
-            data=data,
-            method="POST",
-            headers={"Content-Type": ctype},
+        with open(image_path, "rb") as f:
+            data = f.read()
+        return self._open(
+            f"/library/metadata/{artist_id}/posters", method="POST", data=data, headers={"Content-Type": ctype}
         )
-        with urllib.request.urlopen(req, timeout=self.timeout) as r:
-            return r.read()
+
+
+def make_client(args):
+    return PlexClient(args.base_url, args.token, args.timeout, getattr(args, "api_format", "xml"))
+
+
+class PlexRecord:
+    """The handful of metadata fields the commands read, from XML or JSON responses."""
+
+    __slots__ = (
+        "rating_key",
+        "title",
+        "thumb",
+        "parent_key",
+        "grandparent_key",
+        "index",
+        "added_at",
+        "updated_at",
+        "files",
+        "location",
+    )
+
+    def __init__(self, rating_key="", title="", thumb="", parent_key="", grandparent_key="",
+                 index=0, added_at=0, updated_at=0, files=(), location=""):
+        self.rating_key = rating_key
+        self.title = title
+        self.thumb = thumb
+        self.parent_key = parent_key
+        self.grandparent_key = grandparent_key
+        self.index = index
+        self.added_at = added_at
+        self.updated_at = updated_at
+        self.files = files
+        self.location = location
+
+    @property
+    def file(self):
+        return self.files[0] if self.files else ""
+
+
+def _to_int(value):
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def record_from_xml(el):
+    a = el.attrib
+    loc = el.find("Location")
+    return PlexRecord(
+        a.get("ratingKey", ""),
+        a.get("title", ""),
+        a.get("thumb", ""),
+        a.get("parentRatingKey", ""),
+        a.get("grandparentRatingKey", ""),
+        _to_int(a.get("index")),
+        _to_int(a.get("addedAt")),
+        _to_int(a.get("updatedAt")),
+        tuple(p.attrib.get("file", "") for p in el.iterfind("./Media/Part")),
+        loc.attrib.get("path", "") if loc is not None else "",
+    )
+
+
+def record_from_json(d):
+    locations = d.get("Location") or []
+    return PlexRecord(
+        str(d.get("ratingKey", "")),
+        d.get("title", ""),
+        d.get("thumb", ""),
+        str(d.get("parentRatingKey", "")),
+        str(d.get("grandparentRatingKey", "")),
+        _to_int(d.get("index")),
+        _to_int(d.get("addedAt")),
+        _to_int(d.get("updatedAt")),
+        tuple(p.get("file", "") for m in d.get("Media") or [] for p in m.get("Part") or []),
+        locations[0].get("path", "") if locations else "",
+    )
+
+
+def fetch_records(client: PlexClient, path: str, params=None):
+    """GET a container and return ``(container_attrs, [PlexRecord, ...])``.
+
+    Uses the client's api_format; XML children are Directory/Track elements,
+    JSON items live under ``Metadata`` (or ``Directory`` for section lists).
+    """
+    if getattr(client, "api_format", "xml") == "json":
+        mc = client.get_json(path, params)
+        items = mc.get("Metadata") or mc.get("Directory") or []
+        return mc, [record_from_json(d) for d in items]
+    root = client.get_xml(path, params)
+    return root.attrib, [record_from_xml(el) for el in root if el.tag in ("Directory", "Track")]
+
+
+def list_artists(client: PlexClient, section_id: str, params=None):
+    p = {"type": "8"}
+    p.update(params or {})
+    return fetch_records(client, f"/library/sections/{section_id}/all", p)
 
 
 def parse_map(items):
@@ -158,6 +288,32 @@ def apply_maps(path: str, maps):
     return path
 
 
+def parse_shard(value: str):
+    """Parse ``--shard i/N`` (1-based) into ``(i, N)``."""
+    m = re.fullmatch(r"\s*(\d+)\s*/\s*(\d+)\s*", value or "")
+    if not m:
+        raise ValueError(f"Invalid --shard: {value} (expected i/N)")
+    index, count = int(m.group(1)), int(m.group(2))
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Invalid --shard: {value} (need 1 <= i <= N)")
+    return index, count
+
+
+def in_shard(key: str, shard) -> bool:
+    """Stable hash partitioning: the same key lands in the same shard on every host."""
+    if shard is None:
+        return True
+    import zlib
+
+    index, count = shard
+    return zlib.crc32(key.encode("utf-8")) % count == index - 1
+
+
+def album_folder_key(plex_file: str) -> str:
+    """Shard key for a track: its folder as Plex reports it, before any --path-map."""
+    return plex_file.replace("\\", "/").rpartition("/")[0]
+
+
 def extract_track_number_from_filename(path: str):
     base = os.path.basename(path)
     stem, _ext = os.path.splitext(base)
@@ -176,22 +332,743 @@ def extract_track_number_from_filename(path: str):
     return None
 
 
-def load_all_artists(client: PlexClient, section_id: str):
-    root = client.get_xml(f"/library/sections/{section_id}/all", {"type": "8"})
-    return root
+FLAC_VORBIS_COMMENT = 4
+
+
+def read_flac_comments(path: str):
+    """Read only the VORBIS_COMMENT block of a FLAC file.
+
+    Seeks past STREAMINFO, PICTURE and padding blocks instead of loading them.
+    Returns None when the file is not a plain FLAC stream so callers can fall
+    back to a full mutagen parse.
+    """
+    with open(path, "rb") as f:
+        if f.read(4) != b"fLaC":
+            return None
+        while True:
+            header = f.read(4)
+            if len(header) < 4:
+                return None
+            last = header[0] & 0x80
+            block_type = header[0] & 0x7F
+            length = int.from_bytes(header[1:4], "big")
+            if block_type == FLAC_VORBIS_COMMENT:
+                return parse_vorbis_comment(f.read(length))
+            if last:
+                return {}
+            f.seek(length, os.SEEK_CUR)
+
+
+def parse_vorbis_comment(data: bytes):
+    vendor_len = int.from_bytes(data[0:4], "little")
+    pos = 4 + vendor_len
+    count = int.from_bytes(data[pos : pos + 4], "little")
+    pos += 4
+    tags = {}
+    for _ in range(count):
+        n = int.from_bytes(data[pos : pos + 4], "little")
+        pos += 4
+        entry = data[pos : pos + n].decode("utf-8", "replace")
+        pos += n
+        if "=" not in entry:
+            continue
+        key, value = entry.split("=", 1)
+        tags.setdefault(key.lower(), []).append(value)
+    return tags
+
+
+def read_tags_fast(path: str):
+    """Load just the tag block of a file, without stream info or picture data.
+
+    Returns a mapping with the same ``get(key) -> [values]`` shape as an
+    easy-mode mutagen file, or None when the format has no fast path.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    try:
+        if ext == ".flac":
+            return read_flac_comments(path)
+        if ext == ".mp3":
+            from mutagen.easyid3 import EasyID3
+            from mutagen.id3 import ID3NoHeaderError
+
+            try:
+                return EasyID3(path)
+            except ID3NoHeaderError:
+                return {}
+    except Exception:
+        return None
+    return None
+
+
+def load_easy_tags(path: str):
+    """Return ``(tags, audio)`` for comparison.
+
+    ``audio`` is only set when the fast path was unavailable and a full
+    mutagen parse was needed; writers go through ``open_for_write``, which
+    parses the file only once a change is actually required.
+    """
+    tags = read_tags_fast(path)
+    if tags is not None:
+        return tags, None
+    audio = mutagen_file()(path, easy=True)
+    return audio, audio
+
+
+def open_for_write(path: str, audio):
+    if audio is not None:
+        return audio
+    audio = mutagen_file()(path, easy=True)
+    if audio is None:
+        raise RuntimeError("unreadable on write")
+    return audio
+
+
+def first_tag(audio, key: str):
+    return (audio.get(key) or [""])[0]
+
+
+def fixer_album(before, pending, ctx):
+    pending["album"] = ctx["expected"]
+
+
+def fixer_albumartist(before, pending, ctx):
+    pending["albumartist"] = ctx["expected"]
+
+
+def fixer_tracknumber(before, pending, ctx):
+    desired = ctx["desired_tracknumber"]
+    if desired is None:
+        return
+    current = before.get("tracknumber", "")
+    if current.split("/", 1)[0].strip() != str(desired):
+        pending["tracknumber"] = str(desired)
+
+
+def fixer_preserve_total(before, pending, ctx):
+    new_value = pending.get("tracknumber")
+    current = before.get("tracknumber", "")
+    if new_value is None or "/" in new_value or "/" not in current:
+        return
+    total_part = current.split("/", 1)[1].strip()
+    if total_part:
+        pending["tracknumber"] = f"{new_value}/{total_part}"
+
+
+# Applied in this order regardless of the order given on the command line,
+# so preserve-total always sees the tracknumber fixer's result.
+FIXERS = {
+    "album": fixer_album,
+    "albumartist": fixer_albumartist,
+    "tracknumber": fixer_tracknumber,
+    "preserve-total": fixer_preserve_total,
+}
+FIXER_FIELDS = ("album", "albumartist", "tracknumber")
+
+
+def parse_fixers(value: str):
+    names = [x.strip() for x in value.split(",") if x.strip()]
+    unknown = [n for n in names if n not in FIXERS]
+    if unknown:
+        raise ValueError(f"Unknown fixer(s): {', '.join(unknown)} (choose from {', '.join(FIXERS)})")
+    if not names:
+        raise ValueError("At least one fixer is required")
+    return [n for n in FIXERS if n in names]
+
+
+def plan_tag_changes(before, fixers, ctx):
+    pending = {}
+    for name in fixers:
+        FIXERS[name](before, pending, ctx)
+    return {k: v for k, v in pending.items() if before.get(k, "") != v}
+
+
+def file_fingerprint(path: str):
+    st = os.stat(path)
+    return (st.st_size, st.st_mtime_ns)
+
+
+PLAN_HEADER = ["path", "size", "mtime_ns", "field", "before", "after"]
+
+
+def plan_rows(host: str, fingerprint, before, changes):
+    """One plan row per field a file would change, stamped with its fingerprint."""
+    size, mtime_ns = fingerprint
+    return [[host, size, mtime_ns, k, before.get(k, ""), v] for k, v in sorted(changes.items())]
+
+
+def write_plan(path: str, rows):
+    import csv
+
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(PLAN_HEADER)
+        w.writerows(rows)
+
+
+def read_plan(path: str):
+    """Return ``{path: ((size, mtime_ns), {field: (before, after)})}`` in plan order."""
+    import csv
+
+    plan = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            fp = (int(row["size"]), int(row["mtime_ns"]))
+            entry = plan.setdefault(row["path"], (fp, {}))
+            entry[1][row["field"]] = (row["before"], row["after"])
+    return plan
+
+
+FIX_ALL_HEADER = [
+    "path",
+    "status",
+    "expected_folder",
+    "desired_tracknumber",
+    "before_album",
+    "before_albumartist",
+    "before_tracknumber",
+    "changed_fields",
+    "error",
+]
+
+
+def fix_tag_file(host: str, expected: str, fixers, dry_run: bool, plan=None):
+    """Run the fixer pipeline over one file with a single open/modify/save.
+
+    When ``plan`` is a list, rows describing the intended change are appended
+    to it (see ``plan_rows``).
+    """
+    desired = extract_track_number_from_filename(host)
+    ctx = {"expected": expected, "desired_tracknumber": desired}
+    desired_out = "" if desired is None else desired
+
+    if not os.path.exists(host):
+        return [host, "missing", expected, desired_out, "", "", "", "", ""]
+    if not os.access(host, os.W_OK):
+        return [host, "permission_denied", expected, desired_out, "", "", "", "", ""]
+
+    try:
+        fingerprint = file_fingerprint(host)
+        tags, audio = load_easy_tags(host)
+        if tags is None:
+            return [host, "unreadable", expected, desired_out, "", "", "", "", ""]
+
+        before = {k: first_tag(tags, k) for k in FIXER_FIELDS}
+        changes = plan_tag_changes(before, fixers, ctx)
+        befores = [before["album"], before["albumartist"], before["tracknumber"]]
+        changed_fields = ",".join(sorted(changes))
+        if plan is not None:
+            plan.extend(plan_rows(host, fingerprint, before, changes))
+
+        if not changes:
+            status = "ok_already"
+        elif dry_run:
+            status = "would_update"
+        else:
+            audio = open_for_write(host, audio)
+            for k, v in changes.items():
+                audio[k] = [v]
+            audio.save()
+            status = "updated"
+        return [host, status, expected, desired_out, *befores, changed_fields, ""]
+    except Exception as e:
+        return [host, "error", expected, desired_out, "", "", "", "", str(e)]
+
+
+AUDIO_EXTENSIONS = (
+    ".flac", ".mp3", ".m4a", ".aac", ".alac", ".ogg", ".oga", ".opus",
+    ".wav", ".aif", ".aiff", ".wma", ".ape", ".wv", ".dsf", ".dff",
+)
+
+
+def is_audio_file(path: str):
+    return path.lower().endswith(AUDIO_EXTENSIONS)
+
+
+class PollingWatcher:
+    """Detect new or modified audio files by rescanning roots every interval."""
+
+    def __init__(self, roots, interval: float = 30.0):
+        self.roots = list(roots)
+        self.interval = interval
+        self.snapshot = self._scan()
+        self.last_scan = time.monotonic()
+
+    def _scan(self):
+        out = {}
+        for root in self.roots:
+            for dirpath, _dirs, files in os.walk(root):
+                for fn in files:
+                    path = os.path.join(dirpath, fn)
+                    if not is_audio_file(path):
+                        continue
+                    try:
+                        out[path] = file_fingerprint(path)
+                    except OSError:
+                        continue
+        return out
+
+    def read(self, timeout: float):
+        """Wait up to ``timeout``; rescans only once ``interval`` has passed since the last scan."""
+        remaining = self.last_scan + self.interval - time.monotonic()
+        if remaining > timeout:
+            time.sleep(timeout)
+            return []
+        time.sleep(max(0.0, remaining))
+        current = self._scan()
+        self.last_scan = time.monotonic()
+        changed = [p for p, fp in current.items() if self.snapshot.get(p) != fp]
+        self.snapshot = current
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Linux inotify watcher over every directory below the roots (ctypes, no deps)."""
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+    def __init__(self, roots):
+        import ctypes
+        import ctypes.util
+
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self.libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs = {}
+        for root in roots:
+            self._add_tree(root)
+
+    def _add_tree(self, top: str):
+        """Watch ``top`` and its subdirectories; return audio files already inside."""
+        found = []
+        for dirpath, _dirs, files in os.walk(top):
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(dirpath), self.MASK)
+            if wd >= 0:
+                self.dirs[wd] = dirpath
+            found.extend(os.path.join(dirpath, fn) for fn in files if is_audio_file(fn))
+        return found
+
+    def read(self, timeout: float):
+        import select
+        import struct
+
+        ready, _w, _x = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        changed = []
+        pos = 0
+        while pos + 16 <= len(data):
+            wd, mask, _cookie, name_len = struct.unpack_from("iIII", data, pos)
+            name = data[pos + 16 : pos + 16 + name_len].rstrip(b"\0")
+            pos += 16 + name_len
+            if mask & self.IN_Q_OVERFLOW:
+                eprint("watch: inotify queue overflow, some events were dropped")
+                continue
+            if mask & self.IN_IGNORED:
+                self.dirs.pop(wd, None)
+                continue
+            parent = self.dirs.get(wd)
+            if parent is None or not name:
+                continue
+            path = os.path.join(parent, os.fsdecode(name))
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    changed.extend(self._add_tree(path))
+            elif mask & (self.IN_CLOSE_WRITE | self.IN_MOVED_TO) and is_audio_file(path):
+                changed.append(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+def make_watcher(roots, poll: bool = False, interval: float = 30.0):
+    if not poll and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(roots)
+        except Exception as e:
+            eprint(f"watch: inotify unavailable ({e}); falling back to polling")
+    return PollingWatcher(roots, interval)
+
+
+class Debouncer:
+    """Collect keys and release them once they have been quiet for ``delay`` seconds."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.last_seen = {}
+
+    def add(self, key, now: float):
+        self.last_seen[key] = now
+
+    def pop_ready(self, now: float):
+        ready = [k for k, t in self.last_seen.items() if now - t >= self.delay]
+        for k in ready:
+            del self.last_seen[k]
+        return sorted(ready)
+
+    def __len__(self):
+        return len(self.last_seen)
+
+
+def reverse_maps(maps):
+    return [(dst, src) for src, dst in maps]
+
+
+NAME_ARTICLES = ("the", "a", "an")
+TRAILING_ARTICLE_RE = re.compile(r"^(.*?),\s*(" + "|".join(NAME_ARTICLES) + r")\s*$", re.IGNORECASE)
+
+
+def normalize_artist_name(name: str):
+    """Fold an artist title to a lookup key.
+
+    Strips diacritics (NFKD), casefolds, moves a trailing ", The" to the front,
+    drops a leading article and removes punctuation and whitespace, so
+    "Björk", "The Beatles", "Beatles, The" and "V.A." / "V. A." collapse to
+    "bjork", "beatles", "beatles" and "va".
+    """
+    import unicodedata
+
+    s = unicodedata.normalize("NFKD", name.strip())
+    s = "".join(c for c in s if not unicodedata.combining(c)).casefold()
+    m = TRAILING_ARTICLE_RE.match(s)
+    if m:
+        s = f"{m.group(2)} {m.group(1)}"
+    words = re.sub(r"[^\w\s]", "", s).split()
+    if len(words) > 1 and words[0] in NAME_ARTICLES:
+        words = words[1:]
+    return "".join(words)
+
+
+def parse_name_pattern(pattern: str):
+    """Split a --artist-names entry into ("name"|"regex", value).
 
+    Only entries with an explicit ``glob:`` or ``re:`` prefix are patterns, so
+    names such as ``Who?`` or ``[Unknown Artist]`` stay exact. Globs must
+    match the whole title; ``re:`` expressions are searched as written.
+    """
+    import fnmatch
+
+    if pattern.startswith("re:"):
+        return "regex", pattern[3:]
+    if pattern.startswith("glob:"):
+        return "regex", "^" + fnmatch.translate(pattern[5:])
+    return "name", pattern
+
+
+class ArtistNameIndex:
+    """Exact and normalized lookup tables over one artist listing.
+
+    Built once per run; plain names are O(1) dict lookups and all glob/regex
+    patterns are folded into a single compiled alternation checked in one
+    pass over the listing.
+    """
+
+    def __init__(self, artists):
+        self.artists = list(artists)
+        self.exact = {}
+        self.normalized = {}
+        for pos, (_rk, title) in enumerate(self.artists):
+            self.exact.setdefault(title.lower(), []).append(pos)
+            self.normalized.setdefault(normalize_artist_name(title), []).append(pos)
+
+    def match(self, patterns, mode: str = "exact"):
+        hits = set()
+        regexes = []
+        for pattern in patterns:
+            kind, value = parse_name_pattern(pattern.strip())
+            if kind == "regex":
+                regexes.append(f"(?:{value})")
+            elif mode == "normalized":
+                hits.update(self.normalized.get(normalize_artist_name(value), ()))
+            else:
+                hits.update(self.exact.get(value.lower(), ()))
+        if regexes:
+            combined = re.compile("|".join(regexes), re.IGNORECASE)
+            for pos, (_rk, title) in enumerate(self.artists):
+                if combined.search(title):
+                    hits.add(pos)
+        return [self.artists[pos] for pos in sorted(hits)]
+
+
+# Above this many names one full listing is cheaper than per-name queries.
+FILTERED_LOOKUP_MAX_NAMES = 50
+
+
+def lookup_artists_filtered(client: PlexClient, section_id: str, names, workers: int = 8):
+    """Resolve exact names with one server-side ``title=`` query per name, run concurrently.
+
+    Plex's title filter is a case-insensitive substring match, so results are
+    narrowed to exact (case-insensitive) titles client-side.
+    """
+
+    def lookup(name):
+        _mc, artists = list_artists(client, section_id, {"title": name})
+        wanted = name.lower()
+        return [(a.rating_key, a.title) for a in artists if a.title.lower() == wanted]
+
+    from concurrent.futures import ThreadPoolExecutor
 
-def find_artists_by_name(client: PlexClient, section_id: str, names):
-    root = load_all_artists(client, section_id)
-    wanted = {n.strip().lower() for n in names}
     out = []
-    for d in root.findall("Directory"):
-        title = d.attrib.get("title", "")
-        if title.lower() in wanted:
-            out.append((d.attrib.get("ratingKey", ""), title))
+    seen = set()
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(names)))) as pool:
+        for hits in pool.map(lookup, names):
+            for hit in hits:
+                if hit[0] not in seen:
+                    seen.add(hit[0])
+                    out.append(hit)
     return out
 
 
+def can_lookup_filtered(names, mode: str):
+    return (
+        mode == "exact"
+        and 0 < len(names) <= FILTERED_LOOKUP_MAX_NAMES
+        and all(parse_name_pattern(n.strip())[0] == "name" for n in names)
+    )
+
+
+def find_artists_by_name(
+    client: PlexClient,
+    section_id: str,
+    names,
+    mode: str = "exact",
+    lookup: str = "auto",
+    workers: int = 8,
+):
+    """Find artists by name/pattern.
+
+    ``lookup`` is ``auto`` (filtered queries when every entry is a plain name
+    in exact mode, otherwise the full listing), ``filtered`` or ``full``.
+    Filtered lookups fall back to the full listing if they fail or cannot
+    express the request.
+    """
+    names = [n.strip() for n in names if n.strip()]
+    if lookup != "full" and can_lookup_filtered(names, mode):
+        try:
+            return lookup_artists_filtered(client, section_id, names, workers)
+        except Exception as e:
+            eprint(f"filtered_lookup_failed, falling back to full listing: {e}")
+    elif lookup == "filtered":
+        if len(names) > FILTERED_LOOKUP_MAX_NAMES:
+            reason = f"{len(names)} names exceed the filtered lookup limit of {FILTERED_LOOKUP_MAX_NAMES}"
+        else:
+            reason = "filtered lookup needs plain names with --name-match exact"
+        eprint(f"{reason}; using full listing")
+
+    _mc, artists = list_artists(client, section_id)
+    return ArtistNameIndex((a.rating_key, a.title) for a in artists).match(names, mode)
+
+
+def collect_artist_names(args):
+    """Names/patterns from --artist-names (comma-separated) plus --artist-names-file (one per line)."""
+    names = [x.strip() for x in args.artist_names.split(",") if x.strip()]
+    if getattr(args, "artist_names_file", ""):
+        with open(args.artist_names_file, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    names.append(line)
+    return names
+
+
+def iter_section_items(client: PlexClient, section_id: str, item_type: str, params=None, page_size: int = 500):
+    """Yield section items of one Plex type, paging with X-Plex-Container-Start/Size."""
+    start = 0
+    while True:
+        p = dict(params or {})
+        p.update({"type": item_type, "X-Plex-Container-Start": start, "X-Plex-Container-Size": page_size})
+        mc, items = fetch_records(client, f"/library/sections/{section_id}/all", p)
+        yield from items
+        start += len(items)
+        # "size" only counts this page, so without totalSize keep paging until a short page.
+        total = _to_int(mc.get("totalSize"))
+        if len(items) < page_size or (total and start >= total):
+            return
+
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sync_state (
+    section TEXT PRIMARY KEY,
+    watermark INTEGER NOT NULL,
+    synced_at INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS artists (
+    rating_key TEXT PRIMARY KEY,
+    section TEXT NOT NULL,
+    title TEXT NOT NULL,
+    title_lower TEXT NOT NULL,
+    thumb TEXT NOT NULL,
+    added_at INTEGER NOT NULL,
+    updated_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS artists_section_title ON artists (section, title_lower);
+CREATE TABLE IF NOT EXISTS albums (
+    rating_key TEXT PRIMARY KEY,
+    section TEXT NOT NULL,
+    artist_key TEXT NOT NULL,
+    title TEXT NOT NULL,
+    thumb TEXT NOT NULL,
+    added_at INTEGER NOT NULL,
+    updated_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS albums_artist ON albums (artist_key);
+CREATE TABLE IF NOT EXISTS tracks (
+    rating_key TEXT PRIMARY KEY,
+    section TEXT NOT NULL,
+    album_key TEXT NOT NULL,
+    artist_key TEXT NOT NULL,
+    title TEXT NOT NULL,
+    track_index INTEGER NOT NULL,
+    added_at INTEGER NOT NULL,
+    updated_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tracks_album ON tracks (album_key);
+CREATE INDEX IF NOT EXISTS tracks_artist ON tracks (artist_key);
+CREATE TABLE IF NOT EXISTS parts (
+    track_key TEXT NOT NULL,
+    file TEXT NOT NULL,
+    PRIMARY KEY (track_key, file)
+);
+CREATE INDEX IF NOT EXISTS parts_file ON parts (file);
+"""
+
+# Plex item types mirrored into the index, in dependency order.
+INDEX_TYPES = (("8", "artists"), ("9", "albums"), ("10", "tracks"))
+INDEX_FILTER_FIELDS = ("updatedAt", "addedAt")
+
+
+def open_index(path: str):
+    import sqlite3
+
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.executescript(INDEX_SCHEMA)
+    return conn
+
+
+def index_upsert(conn, section_id: str, table: str, rec: PlexRecord):
+    rk = rec.rating_key
+    if table == "artists":
+        conn.execute(
+            "INSERT OR REPLACE INTO artists VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (rk, section_id, rec.title, rec.title.lower(), rec.thumb, rec.added_at, rec.updated_at),
+        )
+    elif table == "albums":
+        conn.execute(
+            "INSERT OR REPLACE INTO albums VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (rk, section_id, rec.parent_key, rec.title, rec.thumb, rec.added_at, rec.updated_at),
+        )
+    else:
+        conn.execute(
+            "INSERT OR REPLACE INTO tracks VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                rk,
+                section_id,
+                rec.parent_key,
+                rec.grandparent_key,
+                rec.title,
+                rec.index,
+                rec.added_at,
+                rec.updated_at,
+            ),
+        )
+        conn.execute("DELETE FROM parts WHERE track_key = ?", (rk,))
+        for pfile in rec.files:
+            conn.execute("INSERT OR IGNORE INTO parts VALUES (?, ?)", (rk, pfile))
+    return max(rec.added_at, rec.updated_at)
+
+
+def sync_index(client: PlexClient, conn, section_id: str, full: bool = False, page_size: int = 500):
+    """Mirror a section's artists/albums/tracks into the index.
+
+    Incremental runs only fetch items whose updatedAt/addedAt is at or after
+    the previous watermark (Plex's ``>>=`` is strictly greater, so the query
+    starts one second earlier; upserts make the overlap harmless). Deletions on the server are only picked up by a
+    full sync.
+    """
+    row = conn.execute("SELECT watermark FROM sync_state WHERE section = ?", (section_id,)).fetchone()
+    watermark = 0 if (full or row is None) else row[0]
+    if full:
+        for table in ("artists", "albums", "tracks"):
+            if table == "tracks":
+                conn.execute(
+                    "DELETE FROM parts WHERE track_key IN (SELECT rating_key FROM tracks WHERE section = ?)",
+                    (section_id,),
+                )
+            conn.execute(f"DELETE FROM {table} WHERE section = ?", (section_id,))
+
+    counts = Counter()
+    new_watermark = watermark
+    for item_type, table in INDEX_TYPES:
+        filters = [{}] if watermark == 0 else [{f"{field}>>": watermark - 1} for field in INDEX_FILTER_FIELDS]
+        seen = set()
+        for params in filters:
+            for rec in iter_section_items(client, section_id, item_type, params, page_size):
+                if rec.rating_key in seen:
+                    continue
+                seen.add(rec.rating_key)
+                new_watermark = max(new_watermark, index_upsert(conn, section_id, table, rec))
+                counts[table] += 1
+
+    conn.execute(
+        "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?)",
+        (section_id, new_watermark, int(time.time())),
+    )
+    conn.commit()
+    return counts, watermark, new_watermark
+
+
+def index_find_artists_by_name(conn, section_id: str, names, mode: str = "exact"):
+    if mode != "exact" or any(parse_name_pattern(n.strip())[0] != "name" for n in names):
+        cur = conn.execute(
+            "SELECT rating_key, title FROM artists WHERE section = ? ORDER BY title_lower",
+            (section_id,),
+        )
+        return ArtistNameIndex(cur).match(names, mode)
+    wanted = sorted({n.strip().lower() for n in names})
+    marks = ",".join("?" for _ in wanted)
+    cur = conn.execute(
+        f"SELECT rating_key, title FROM artists WHERE section = ? AND title_lower IN ({marks}) ORDER BY title_lower",
+        (section_id, *wanted),
+    )
+    return [(rk, title) for rk, title in cur]
+
+
+def index_artist_track_rows(conn, artist_key: str):
+    """Yield (album_id, album_title, track_id, track_title, file) for one artist."""
+    cur = conn.execute(
+        """
+        SELECT al.rating_key, al.title, t.rating_key, t.title, MIN(p.file)
+        FROM albums al
+        JOIN tracks t ON t.album_key = al.rating_key
+        JOIN parts p ON p.track_key = t.rating_key
+        WHERE al.artist_key = ?
+        GROUP BY t.rating_key
+        ORDER BY al.title, al.rating_key, t.track_index, t.rating_key
+        """,
+        (artist_key,),
+    )
+    yield from cur
+
+
 def detect_corrupt_thumb_header(head: bytes):
     return head.startswith(b"----------------") and (b"Content-Disposition" in head)
 
@@ -223,51 +1100,122 @@ def choose_best_image(files, location_root):
     return sorted(files, key=rank)[0]
 
 
-def cmd_export_artist_tracks(args):
-    client = PlexClient(args.base_url, args.token, args.timeout)
-    names = [x.strip() for x in args.artist_names.split(",") if x.strip()]
-    found = find_artists_by_name(client, args.section, names)
+def iter_api_artist_track_rows(client: PlexClient, aid: str):
+    """Yield (album_id, album_title, track_id, track_title, file) by walking /children."""
+    _mc, albums = fetch_records(client, f"/library/metadata/{aid}/children")
+    for alb in albums:
+        _mc, tracks = fetch_records(client, f"/library/metadata/{alb.rating_key}/children")
+        for tr in tracks:
+            if not tr.files:
+                continue
+            yield alb.rating_key, alb.title, tr.rating_key, tr.title, tr.file
+
+
+POSTER_FONT_BOLD = "/usr/share/fonts/TTF/DejaVuSans-Bold.ttf"
+POSTER_FONT_REGULAR = "/usr/share/fonts/TTF/DejaVuSans.ttf"
+POSTER_BASE_SIZE = 1500
+
+# Per-process font cache keyed by poster size; pool workers load fonts once.
+_poster_fonts = {}
+
+
+def poster_fonts(size: int):
+    fonts = _poster_fonts.get(size)
+    if fonts is None:
+        from PIL import ImageFont
+
+        try:
+            fonts = (
+                ImageFont.truetype(POSTER_FONT_BOLD, max(8, 110 * size // POSTER_BASE_SIZE)),
+                ImageFont.truetype(POSTER_FONT_REGULAR, max(8, 36 * size // POSTER_BASE_SIZE)),
+            )
+        except Exception:
+            fonts = (ImageFont.load_default(), ImageFont.load_default())
+        _poster_fonts[size] = fonts
+    return fonts
+
+
+def render_generated_poster(title: str, out_path: str, size: int = POSTER_BASE_SIZE, quality: int = 95):
+    """Render a placeholder artist poster to ``out_path`` (runs in pool workers)."""
+    from PIL import Image, ImageDraw
+
+    f1, f2 = poster_fonts(size)
+    scale = size / POSTER_BASE_SIZE
+    spacing = max(1, int(16 * scale))
+    img = Image.new("RGB", (size, size), (17, 22, 35))
+    draw = ImageDraw.Draw(img)
+    title_wrapped = title.replace(" - ", "\n")
+    bb = draw.multiline_textbbox((0, 0), title_wrapped, font=f1, spacing=spacing, align="center")
+    tw, th = bb[2] - bb[0], bb[3] - bb[1]
+    draw.multiline_text(((size - tw) // 2, (size - th) // 2), title_wrapped, fill=(106, 216, 255), font=f1, spacing=spacing, align="center")
+    draw.text((int(120 * scale), int(1380 * scale)), "Generated cover", fill=(200, 200, 220), font=f2)
+    img.save(out_path, "JPEG", quality=quality)
+    return out_path
+
+
+EXPORT_HEADER = [
+    "artist_id",
+    "artist_title",
+    "album_id",
+    "album_title",
+    "track_id",
+    "track_title",
+    "plex_file",
+    "expected_folder",
+]
+
+
+def resolve_export_source(args):
+    """Return ``(found_artists, track_rows)`` from the index or the Plex API."""
+    names = collect_artist_names(args)
+    if not names:
+        raise SystemExit("Provide --artist-names or --artist-names-file")
+    if getattr(args, "service", ""):
+        if getattr(args, "index_db", ""):
+            raise SystemExit("--service and --index-db cannot be combined")
+        params = {"section": args.section, "name": names, "name_match": args.name_match}
+        result = service_request(args.service, "/export", params)
+        found = [tuple(a) for a in result["found"]]
+        track_rows = result["tracks"].get
+    elif getattr(args, "index_db", ""):
+        conn = open_index(args.index_db)
+        found = index_find_artists_by_name(conn, args.section, names, args.name_match)
+        track_rows = functools.partial(index_artist_track_rows, conn)
+    else:
+        client = make_client(args)
+        found = find_artists_by_name(
+            client, args.section, names, args.name_match, args.lookup, args.lookup_workers
+        )
+        track_rows = functools.partial(iter_api_artist_track_rows, client)
     if not found:
         raise SystemExit("No matching artist names found")
+    return found, track_rows
+
+
+def cmd_export_artist_tracks(args):
+    import csv
+
+    found, track_rows = resolve_export_source(args)
 
     with open(args.out_csv, "w", newline="", encoding="utf-8") as f:
         w = csv.writer(f)
-        w.writerow([
-            "artist_id",
-            "artist_title",
-            "album_id",
-            "album_title",
-            "track_id",
-            "track_title",
-            "plex_file",
-            "expected_folder",
-        ])
+        w.writerow(EXPORT_HEADER)
 
         rows = 0
         for aid, atitle in found:
-            albums_root = client.get_xml(f"/library/metadata/{aid}/children")
-            albums = albums_root.findall("Directory")
-            for alb in albums:
-                albid = alb.attrib.get("ratingKey", "")
-                altitle = alb.attrib.get("title", "")
-                tracks_root = client.get_xml(f"/library/metadata/{albid}/children")
-                for tr in tracks_root.findall("Track"):
-                    part = tr.find("./Media/Part")
-                    if part is None:
-                        continue
-                    pfile = part.attrib.get("file", "")
-                    expected = os.path.basename(os.path.dirname(pfile))
-                    w.writerow([
-                        aid,
-                        atitle,
-                        albid,
-                        altitle,
-                        tr.attrib.get("ratingKey", ""),
-                        tr.attrib.get("title", ""),
-                        pfile,
-                        expected,
-                    ])
-                    rows += 1
+            for albid, altitle, trid, trtitle, pfile in track_rows(aid):
+                expected = os.path.basename(os.path.dirname(pfile))
+                w.writerow([
+                    aid,
+                    atitle,
+                    albid,
+                    altitle,
+                    trid,
+                    trtitle,
+                    pfile,
+                    expected,
+                ])
+                rows += 1
 
     print(f"artists_found={len(found)}")
     print(f"rows_written={rows}")
@@ -275,17 +1223,23 @@ def cmd_export_artist_tracks(args):
 
 
 def cmd_retag_from_csv(args):
-    if MutagenFile is None:
+    import csv
+
+    if mutagen_file() is None:
         raise SystemExit("mutagen is required for retag-from-csv")
 
     maps = parse_map(args.path_map)
     seen = set()
     rows = []
+    plan = []
     updated = 0
+    dry_run = args.dry_run or bool(args.plan_out)
 
     with open(args.in_csv, newline="", encoding="utf-8") as f:
         for row in csv.DictReader(f):
             p = row["plex_file"]
+            if not in_shard(album_folder_key(p), args.shard):
+                continue
             host = apply_maps(p, maps)
             expected = row["expected_folder"]
 
@@ -301,27 +1255,30 @@ def cmd_retag_from_csv(args):
                 continue
 
             try:
-                audio = MutagenFile(host, easy=True)
-                if audio is None:
+                fingerprint = file_fingerprint(host)
+                tags, audio = load_easy_tags(host)
+                if tags is None:
                     rows.append([host, "unreadable", expected, "", ""])
                     continue
 
-                before_album = (audio.get("album") or [""])[0]
-                before_albumartist = (audio.get("albumartist") or [""])[0]
-
-                changed = False
-                if before_album != expected:
-                    audio["album"] = [expected]
-                    changed = True
-                if before_albumartist != expected:
-                    audio["albumartist"] = [expected]
-                    changed = True
-
-                if changed and not args.dry_run:
+                before_album = first_tag(tags, "album")
+                before_albumartist = first_tag(tags, "albumartist")
+                changed = before_album != expected or before_albumartist != expected
+                if changed and args.plan_out:
+                    before = {"album": before_album, "albumartist": before_albumartist}
+                    changes = {k: expected for k, v in before.items() if v != expected}
+                    plan.extend(plan_rows(host, fingerprint, before, changes))
+
+                if changed and not dry_run:
+                    audio = open_for_write(host, audio)
+                    if before_album != expected:
+                        audio["album"] = [expected]
+                    if before_albumartist != expected:
+                        audio["albumartist"] = [expected]
                     audio.save()
                     updated += 1
                     rows.append([host, "updated", expected, before_album, before_albumartist])
-                elif changed and args.dry_run:
+                elif changed and dry_run:
                     rows.append([host, "would_update", expected, before_album, before_albumartist])
                 else:
                     rows.append([host, "ok_already", expected, before_album, before_albumartist])
@@ -332,27 +1289,39 @@ def cmd_retag_from_csv(args):
         w = csv.writer(f)
         w.writerow(["path", "status", "expected_folder", "before_album", "before_albumartist_or_error"])
         w.writerows(rows)
+    if args.plan_out:
+        write_plan(args.plan_out, plan)
 
     counts = Counter(r[1] for r in rows)
+    if args.shard:
+        print(f"shard={args.shard[0]}/{args.shard[1]}")
     print(f"processed={len(rows)}")
     print(f"updated={updated}")
     for k in sorted(counts):
         print(f"{k}={counts[k]}")
+    if args.plan_out:
+        print(f"plan={args.plan_out}")
     print(f"csv={args.out_csv}")
 
 
 def cmd_fix_track_numbers(args):
-    if MutagenFile is None:
+    import csv
+
+    if mutagen_file() is None:
         raise SystemExit("mutagen is required for fix-track-numbers")
 
     maps = parse_map(args.path_map)
     seen = set()
     rows = []
+    plan = []
     updated = 0
+    dry_run = args.dry_run or bool(args.plan_out)
 
     with open(args.in_csv, newline="", encoding="utf-8") as f:
         for row in csv.DictReader(f):
             p = row["plex_file"]
+            if not in_shard(album_folder_key(p), args.shard):
+                continue
             host = apply_maps(p, maps)
             if host in seen:
                 continue
@@ -371,12 +1340,13 @@ def cmd_fix_track_numbers(args):
                 continue
 
             try:
-                audio = MutagenFile(host, easy=True)
-                if audio is None:
+                fingerprint = file_fingerprint(host)
+                tags, audio = load_easy_tags(host)
+                if tags is None:
                     rows.append([host, "unreadable", desired, ""])
                     continue
 
-                before = (audio.get("tracknumber") or [""])[0]
+                before = first_tag(tags, "tracknumber")
                 before_main = before.split("/", 1)[0].strip()
                 desired_str = str(desired)
 
@@ -389,10 +1359,13 @@ def cmd_fix_track_numbers(args):
                     total_part = before.split("/", 1)[1].strip()
                     if total_part:
                         new_value = f"{desired_str}/{total_part}"
+                if args.plan_out:
+                    plan.extend(plan_rows(host, fingerprint, {"tracknumber": before}, {"tracknumber": new_value}))
 
-                if args.dry_run:
+                if dry_run:
                     rows.append([host, "would_update", desired, before])
                 else:
+                    audio = open_for_write(host, audio)
                     audio["tracknumber"] = [new_value]
                     audio.save()
                     updated += 1
@@ -404,24 +1377,373 @@ def cmd_fix_track_numbers(args):
         w = csv.writer(f)
         w.writerow(["path", "status", "desired_tracknumber", "before_tracknumber_or_error"])
         w.writerows(rows)
+    if args.plan_out:
+        write_plan(args.plan_out, plan)
 
     counts = Counter(r[1] for r in rows)
+    if args.shard:
+        print(f"shard={args.shard[0]}/{args.shard[1]}")
     print(f"processed={len(rows)}")
     print(f"updated={updated}")
     for k in sorted(counts):
         print(f"{k}={counts[k]}")
+    if args.plan_out:
+        print(f"plan={args.plan_out}")
+    print(f"csv={args.out_csv}")
+
+
+def cmd_fix_all(args):
+    import csv
+
+    if mutagen_file() is None:
+        raise SystemExit("mutagen is required for fix-all")
+
+    try:
+        fixers = parse_fixers(args.fixers)
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    maps = parse_map(args.path_map)
+    seen = set()
+    rows = []
+    plan = [] if args.plan_out else None
+    dry_run = args.dry_run or bool(args.plan_out)
+
+    with open(args.in_csv, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            if not in_shard(album_folder_key(row["plex_file"]), args.shard):
+                continue
+            host = apply_maps(row["plex_file"], maps)
+            if host in seen:
+                continue
+            seen.add(host)
+            rows.append(fix_tag_file(host, row["expected_folder"], fixers, dry_run, plan))
+
+    with open(args.out_csv, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(FIX_ALL_HEADER)
+        w.writerows(rows)
+    if args.plan_out:
+        write_plan(args.plan_out, plan)
+
+    counts = Counter(r[1] for r in rows)
+    print(f"fixers={','.join(fixers)}")
+    if args.shard:
+        print(f"shard={args.shard[0]}/{args.shard[1]}")
+    print(f"processed={len(rows)}")
+    print(f"updated={counts.get('updated', 0)}")
+    for k in sorted(counts):
+        print(f"{k}={counts[k]}")
+    if args.plan_out:
+        print(f"plan={args.plan_out}")
+    print(f"csv={args.out_csv}")
+
+
+def apply_planned_file(host: str, fingerprint, fields):
+    """Replay one file's planned changes; returns ``(status, error)``.
+
+    A matching fingerprint means the analysis is still valid and the planned
+    values are written straight away. Otherwise the tags are re-read: fields
+    already at the planned value are skipped, fields still at the planned
+    "before" value are written, and anything else is a conflict left alone.
+    """
+    try:
+        current_fp = file_fingerprint(host)
+    except FileNotFoundError:
+        return "missing", ""
+    try:
+        if current_fp == fingerprint:
+            todo = {k: after for k, (_before, after) in fields.items()}
+            status = "updated"
+            audio = None
+        else:
+            tags, audio = load_easy_tags(host)
+            if tags is None:
+                return "unreadable", ""
+            current = {k: first_tag(tags, k) for k in fields}
+            if any(current[k] not in (before, after) for k, (before, after) in fields.items()):
+                return "stale_conflict", ""
+            todo = {k: after for k, (_before, after) in fields.items() if current[k] != after}
+            if not todo:
+                return "ok_already", ""
+            status = "updated_reanalyzed"
+        audio = open_for_write(host, audio)
+        for k, v in todo.items():
+            audio[k] = [v]
+        audio.save()
+        return status, ""
+    except Exception as e:
+        return "error", str(e)
+
+
+def cmd_apply(args):
+    import csv
+
+    if mutagen_file() is None:
+        raise SystemExit("mutagen is required for apply")
+
+    plan = read_plan(args.plan)
+    rows = []
+    for host, (fingerprint, fields) in plan.items():
+        status, error = apply_planned_file(host, fingerprint, fields)
+        rows.append([host, status, ",".join(sorted(fields)), error])
+
+    with open(args.out_csv, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["path", "status", "fields", "error"])
+        w.writerows(rows)
+
+    counts = Counter(r[1] for r in rows)
+    print(f"processed={len(rows)}")
+    for k in sorted(counts):
+        print(f"{k}={counts[k]}")
+    print(f"csv={args.out_csv}")
+
+
+def cmd_watch(args):
+    import csv
+
+    if mutagen_file() is None:
+        raise SystemExit("mutagen is required for watch")
+    try:
+        fixers = parse_fixers(args.fixers)
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    maps = parse_map(args.path_map)
+    roots = args.root or [dst for _src, dst in maps]
+    roots = [r for r in roots if os.path.isdir(r)]
+    if not roots:
+        raise SystemExit("No existing --root (or --path-map destination) to watch")
+
+    refresh = not (args.no_refresh or args.dry_run)
+    client = None
+    if refresh:
+        if args.server != "plex":
+            raise SystemExit(f"--server {args.server} refresh is not implemented yet; pass --no-refresh")
+        if not args.token:
+            raise SystemExit("Missing --token or PLEX_TOKEN (or pass --no-refresh)")
+        client = make_client(args)
+
+    to_plex = reverse_maps(maps)
+    watcher = make_watcher(roots, poll=args.poll, interval=args.poll_interval)
+    files = Debouncer(args.debounce_seconds)
+    folders = Debouncer(args.refresh_delay)
+    own_writes = {}
+    totals = Counter()
+
+    new_log = not os.path.exists(args.out_csv)
+    if os.path.dirname(args.out_csv):
+        os.makedirs(os.path.dirname(args.out_csv), exist_ok=True)
+    log = open(args.out_csv, "a", newline="", encoding="utf-8")
+    w = csv.writer(log)
+    if new_log:
+        w.writerow(FIX_ALL_HEADER)
+
+    print(f"watching={','.join(roots)} mode={type(watcher).__name__} fixers={','.join(fixers)}", flush=True)
+    deadline = time.monotonic() + args.run_seconds if args.run_seconds > 0 else None
+    try:
+        while deadline is None or time.monotonic() < deadline:
+            now = time.monotonic()
+            for path in watcher.read(timeout=1.0):
+                files.add(path, now)
+
+            now = time.monotonic()
+            batch = Counter()
+            for host in files.pop_ready(now):
+                try:
+                    if own_writes.get(host) == file_fingerprint(host):
+                        del own_writes[host]
+                        continue
+                except OSError:
+                    continue
+                row = fix_tag_file(host, os.path.basename(os.path.dirname(host)), fixers, args.dry_run)
+                w.writerow(row)
+                batch[row[1]] += 1
+                if row[1] == "updated":
+                    try:
+                        own_writes[host] = file_fingerprint(host)
+                    except OSError:
+                        pass
+                if refresh and row[1] in ("updated", "ok_already"):
+                    folders.add(os.path.dirname(host), now)
+            if batch:
+                log.flush()
+                totals.update(batch)
+                print("batch " + " ".join(f"{k}={batch[k]}" for k in sorted(batch)), flush=True)
+
+            for folder in folders.pop_ready(now):
+                plex_path = apply_maps(folder, to_plex)
+                try:
+                    client.get(f"/library/sections/{args.section}/refresh", {"path": plex_path})
+                    totals["refreshed"] += 1
+                    print(f"refreshed={plex_path}", flush=True)
+                except Exception as e:
+                    totals["refresh_err"] += 1
+                    eprint(f"refresh_failed path={plex_path}: {e}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        log.close()
+
+    for k in sorted(totals):
+        print(f"{k}={totals[k]}")
+    print(f"csv={args.out_csv}")
+
+
+def cmd_pipeline(args):
+    """export-artist-tracks -> fix-all -> targeted refresh, streamed.
+
+    The Plex crawl feeds a bounded queue that tag workers drain immediately;
+    once the crawl has moved past a folder and its last file is fixed, that
+    folder's refresh is dispatched while the rest of the run continues.
+    """
+    import csv
+    import queue
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    if mutagen_file() is None:
+        raise SystemExit("mutagen is required for pipeline")
+    try:
+        fixers = parse_fixers(args.fixers)
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    maps = parse_map(args.path_map)
+    client = make_client(args)
+    found, track_rows = resolve_export_source(args)
+
+    work = queue.Queue(maxsize=args.queue_size)
+    lock = threading.Lock()
+    results = []
+    folder_pending = Counter()
+    folder_closed = set()
+    folder_ok = set()
+    refresh = not (args.no_refresh or args.dry_run)
+    refresh_pool = ThreadPoolExecutor(max_workers=args.refresh_workers)
+    refresh_counts = Counter()
+
+    def do_refresh(folder):
+        try:
+            client.get(f"/library/sections/{args.section}/refresh", {"path": folder})
+            with lock:
+                refresh_counts["refreshed"] += 1
+        except Exception as e:
+            with lock:
+                refresh_counts["refresh_err"] += 1
+            eprint(f"refresh_failed path={folder}: {e}")
+
+    def folder_finished(folder):
+        # Called with lock held. Folders where every file failed are not refreshed.
+        if refresh and folder_pending[folder] == 0 and folder in folder_closed:
+            folder_closed.discard(folder)
+            del folder_pending[folder]
+            if folder in folder_ok:
+                folder_ok.discard(folder)
+                refresh_pool.submit(do_refresh, folder)
+
+    def worker():
+        while True:
+            item = work.get()
+            if item is None:
+                return
+            host, expected, folder = item
+            row = fix_tag_file(host, expected, fixers, args.dry_run)
+            with lock:
+                results.append(row)
+                if row[1] in ("updated", "ok_already"):
+                    folder_ok.add(folder)
+                folder_pending[folder] -= 1
+                folder_finished(folder)
+
+    workers = [threading.Thread(target=worker, daemon=True) for _ in range(max(1, args.tag_workers))]
+    for t in workers:
+        t.start()
+
+    export_f = open(args.export_csv, "w", newline="", encoding="utf-8") if args.export_csv else None
+    export_w = csv.writer(export_f) if export_f else None
+    if export_w:
+        export_w.writerow(EXPORT_HEADER)
+
+    seen = set()
+    exported = 0
+    current_folders = set()
+
+    def close_current_folders():
+        with lock:
+            for folder in current_folders:
+                folder_closed.add(folder)
+                folder_finished(folder)
+            current_folders.clear()
+
+    try:
+        for aid, atitle in found:
+            last_album = None
+            for albid, altitle, trid, trtitle, pfile in track_rows(aid):
+                if albid != last_album:
+                    # The crawl is past the previous album: its folders can close.
+                    close_current_folders()
+                    last_album = albid
+                folder = os.path.dirname(pfile)
+                expected = os.path.basename(folder)
+                if export_w:
+                    export_w.writerow([aid, atitle, albid, altitle, trid, trtitle, pfile, expected])
+                exported += 1
+                host = apply_maps(pfile, maps)
+                if host in seen:
+                    continue
+                seen.add(host)
+                with lock:
+                    folder_pending[folder] += 1
+                    current_folders.add(folder)
+                work.put((host, expected, folder))
+            close_current_folders()
+    finally:
+        for _ in workers:
+            work.put(None)
+        for t in workers:
+            t.join()
+        if export_f:
+            export_f.close()
+        refresh_pool.shutdown(wait=True)
+
+    with open(args.out_csv, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(FIX_ALL_HEADER)
+        w.writerows(sorted(results))
+
+    counts = Counter(r[1] for r in results)
+    print(f"artists_found={len(found)}")
+    print(f"rows_exported={exported}")
+    print(f"processed={len(results)}")
+    for k in sorted(counts):
+        print(f"{k}={counts[k]}")
+    print(f"refreshed={refresh_counts['refreshed']}")
+    print(f"refresh_err={refresh_counts['refresh_err']}")
+    if args.export_csv:
+        print(f"export_csv={args.export_csv}")
     print(f"csv={args.out_csv}")
 
 
 def cmd_cleanup_artists(args):
-    client = PlexClient(args.base_url, args.token, args.timeout)
+    import csv
+
+    client = make_client(args)
 
     ids = []
     if args.artist_ids:
         ids.extend([x.strip() for x in args.artist_ids.split(",") if x.strip()])
-    if args.artist_names:
-        names = [x.strip() for x in args.artist_names.split(",") if x.strip()]
-        ids.extend([x[0] for x in find_artists_by_name(client, args.section, names)])
+    names = collect_artist_names(args)
+    if names:
+        if args.index_db:
+            found = index_find_artists_by_name(open_index(args.index_db), args.section, names, args.name_match)
+        else:
+            found = find_artists_by_name(
+                client, args.section, names, args.name_match, args.lookup, args.lookup_workers
+            )
+        ids.extend([x[0] for x in found])
 
     ids = sorted(set(ids))
     deleted = 0
@@ -477,149 +1799,502 @@ def cmd_cleanup_artists(args):
     print(f"scan_path_err={scans_err}")
 
 
-def cmd_repair_artist_posters(args):
-    client = PlexClient(args.base_url, args.token, args.timeout)
+def load_profiles(path: str):
+    """Read server profiles from an INI file: one ``[name]`` per server.
+
+    Keys: ``base_url``, ``token``, optional ``sections`` (comma-separated)
+    and ``max_concurrency``.
+    """
+    import configparser
+
+    cp = configparser.ConfigParser(interpolation=None)
+    if not cp.read(path, encoding="utf-8"):
+        raise SystemExit(f"Profiles file not found: {path}")
+    return {name: dict(cp[name]) for name in cp.sections()}
+
+
+def resolve_targets(args):
+    """Expand --target profiles and a comma-separated --section into per-section runs.
+
+    Returns ``[(label, args_copy)]`` where each copy has ``base_url``, ``token``
+    and a single ``section`` set. Without --target the global connection is
+    used and labels are section ids.
+    """
+    sections = [x.strip() for x in str(args.section).split(",") if x.strip()]
+    targets = []
+    for name in getattr(args, "target", None) or [None]:
+        conn = {"base_url": args.base_url, "token": args.token, "max_concurrency": args.max_per_server}
+        target_sections = sections
+        if name is not None:
+            profiles = load_profiles(args.profiles)
+            if name not in profiles:
+                raise SystemExit(f"Unknown --target {name} (profiles: {', '.join(profiles) or 'none'})")
+            if not profiles[name].get("base_url"):
+                raise SystemExit(f"Profile {name} has no base_url")
+            if not profiles[name].get("token"):
+                raise SystemExit(f"Profile {name} has no token")
+            conn.update(profiles[name])
+            target_sections = [x.strip() for x in conn.get("sections", "").split(",") if x.strip()] or sections
+        for section in target_sections:
+            ns = argparse.Namespace(**vars(args))
+            ns.base_url = conn["base_url"]
+            ns.token = conn["token"]
+            ns.section = section
+            ns.max_per_server = int(conn["max_concurrency"])
+            targets.append((f"{name}:{section}" if name else section, ns))
+    if not targets:
+        raise SystemExit("No sections to process")
+    return targets
+
+
+def run_targets(targets, job):
+    """Run ``job(args)`` for every target concurrently, at most ``max_per_server`` per server.
+
+    Returns ``[(label, result, error)]`` in target order; a failing target
+    does not stop the others.
+    """
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    limits = {}
+    for _label, ns in targets:
+        limits.setdefault(ns.base_url.rstrip("/"), threading.Semaphore(max(1, ns.max_per_server)))
+
+    def one(target):
+        _label, ns = target
+        with limits[ns.base_url.rstrip("/")]:
+            try:
+                return job(ns), ""
+            except (SystemExit, Exception) as e:
+                return None, str(e)
+
+    with ThreadPoolExecutor(max_workers=len(targets)) as pool:
+        outcomes = list(pool.map(one, targets))
+    return [(label, result, error) for (label, _ns), (result, error) in zip(targets, outcomes)]
+
+
+def report_targets(args, results, header):
+    """Write a combined report with a leading ``target`` column and print per-target and total counters.
+
+    Each result is ``(summary, rows)`` where ``summary`` maps counter names to ints.
+    """
+    import csv
+
+    totals = {}
+    failed = 0
+    out_csv = getattr(args, "out_csv", "")
+    f = open(out_csv, "w", newline="", encoding="utf-8") if out_csv else None
+    try:
+        w = csv.writer(f) if f else None
+        if w:
+            w.writerow(["target"] + header)
+        print(f"targets={len(results)}")
+        for label, result, error in results:
+            if result is None:
+                failed += 1
+                print(f"error[{label}]={error}")
+                continue
+            summary, rows = result
+            for key, value in summary.items():
+                print(f"{key}[{label}]={value}")
+                totals[key] = totals.get(key, 0) + value
+            if w:
+                w.writerows([label] + list(r) for r in rows)
+    finally:
+        if f:
+            f.close()
+    for key, value in totals.items():
+        print(f"{key}={value}")
+    print(f"targets_failed={failed}")
+    if out_csv:
+        print(f"csv={out_csv}")
+    if failed:
+        raise SystemExit(f"{failed} of {len(results)} targets failed")
+
+
+def classify_new_poster(client: PlexClient, new_thumb: str):
+    if not new_thumb:
+        return "failed_no_thumb"
+    new_head = client.get_bytes(new_thumb)[:220]
+    if is_valid_image_header(new_head) and not detect_corrupt_thumb_header(new_head):
+        return "fixed"
+    return "failed_after_apply"
+
+
+VERIFY_RELIST_MIN = 50
+
+
+def verify_applied_posters(
+    client: PlexClient, section: str, applied, retries: int = 3, backoff: float = 2.0, workers: int = 8, no_retry=()
+):
+    """Check uploaded posters after all uploads are done.
+
+    ``applied`` maps artist id -> thumb before the upload. The first round
+    re-lists the section once and probes only thumbs that changed; artists
+    whose thumb is unchanged or not ``fixed`` yet (Plex may still be
+    processing the upload) are retried with exponential backoff, fetched
+    individually once few remain. An unchanged thumb is never fetched.
+    Artists in ``no_retry`` (nothing was uploaded) are only checked once.
+    Returns ``{artist_id: (status, error)}``.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    results = {}
+    probed = {}
+    remaining = dict(applied)
+
+    def current_thumbs(aids, relist):
+        if relist:
+            _mc, artists = list_artists(client, section)
+            return {a.rating_key: a.thumb for a in artists if a.rating_key in aids}
+
+        def one(aid):
+            _mc, meta = fetch_records(client, f"/library/metadata/{aid}")
+            return meta[0].thumb if meta else ""
+
+        return dict(zip(aids, pool.map(one, aids)))
+
+    def probe(item):
+        _aid, thumb = item
+        try:
+            # Thumb paths change with every upload, so a verdict per path is final.
+            if thumb not in probed:
+                probed[thumb] = classify_new_poster(client, thumb)
+            return probed[thumb], ""
+        except Exception as e:
+            return "error", str(e)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for attempt in range(retries + 1):
+            if attempt:
+                time.sleep(backoff * 2 ** (attempt - 1))
+            aids = list(remaining)
+            try:
+                thumbs = current_thumbs(aids, attempt == 0 or len(aids) >= VERIFY_RELIST_MIN)
+            except Exception as e:
+                for aid in aids:
+                    results[aid] = ("error", str(e))
+                continue
+            final = attempt == retries
+            todo = []
+            for aid in aids:
+                thumb = thumbs.get(aid, "")
+                if thumb != applied[aid]:
+                    todo.append((aid, thumb))
+                elif final or aid in no_retry:
+                    # Plex never swapped the thumb; only now is that a verdict.
+                    results[aid] = ("failed_after_apply" if thumb else "failed_no_thumb", "")
+                    del remaining[aid]
+            for (aid, _thumb), outcome in zip(todo, pool.map(probe, todo)):
+                results[aid] = outcome
+                if outcome[0] == "fixed" or aid in no_retry:
+                    del remaining[aid]
+            if not remaining:
+                break
+    return results
+
+
+def start_render_pool(workers: int):
+    """Create the poster render pool from the calling (main) thread.
+
+    One trivial task starts the workers right away; fork-based pools launch
+    all processes on first use, so they are never forked from a worker thread.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+    pool.submit(int).result()
+    return pool
+
+
+def repair_artist_posters(args, render_pool=None):
+    """Repair one section's artist posters; returns ``(rows, fixed)``.
+
+    ``render_pool`` is a shared pool for generated posters; without one a
+    pool is started on first use and shut down before returning.
+    """
+    from concurrent.futures import FIRST_COMPLETED, wait
+
+    client = make_client(args)
     maps = parse_map(args.path_map)
 
-    root = load_all_artists(client, args.section)
+    _mc, artists = list_artists(client, args.section)
+    artists = [a for a in artists if in_shard(a.rating_key, args.shard)]
     rows = []
     fixed = 0
 
-    for d in root.findall("Directory"):
-        aid = d.attrib.get("ratingKey", "")
-        title = d.attrib.get("title", "")
-        thumb = d.attrib.get("thumb", "")
+    # Generated posters render in a process pool; uploads happen as renders
+    # finish, interleaved with the API work for the remaining artists.
+    pool = render_pool
+    pending = {}
+    applied = {}
+
+    def finish(aid, title, thumb, source):
+        nonlocal fixed
+        if args.verify_mode == "deferred":
+            applied[aid] = (len(rows), thumb)
+            rows.append([aid, title, thumb, source, "", ""])
+            return
+        try:
+            _mc, meta = fetch_records(client, f"/library/metadata/{aid}")
+            status = classify_new_poster(client, meta[0].thumb if meta else "")
+            if status == "fixed":
+                fixed += 1
+            rows.append([aid, title, thumb, source, status, ""])
+        except Exception as e:
+            rows.append([aid, title, thumb, source, "error", str(e)])
 
-        need_fix = False
-        if not thumb and args.fix_missing:
-            need_fix = True
-        elif thumb and args.fix_corrupt:
-            head = client.get_bytes(thumb)[:220]
-            if detect_corrupt_thumb_header(head):
-                need_fix = True
+    def upload_rendered(done):
+        for fut in done:
+            aid, title, thumb = pending.pop(fut)
+            try:
+                gen = fut.result()
+            except Exception as ge:
+                rows.append([aid, title, thumb, "", "error", f"generate_failed: {ge}"])
+                continue
+            try:
+                client.post_raw_poster(aid, gen)
+            except Exception as e:
+                rows.append([aid, title, thumb, f"generated:{gen}", "error", str(e)])
+                continue
+            finish(aid, title, thumb, f"generated:{gen}")
 
-        if not need_fix:
-            continue
+    try:
+        for artist in artists:
+            aid = artist.rating_key
+            title = artist.title
+            thumb = artist.thumb
 
-        source = ""
-        status = ""
-        error = ""
+            need_fix = False
+            if not thumb and args.fix_missing:
+                need_fix = True
+            elif thumb and args.fix_corrupt:
+                head = client.get_bytes(thumb)[:220]
+                if detect_corrupt_thumb_header(head):
+                    need_fix = True
 
-        try:
-            # 1) album thumb
-            alb_root = client.get_xml(f"/library/metadata/{aid}/children")
-            album_thumb = ""
-            for alb in alb_root.findall("Directory"):
-                t = alb.attrib.get("thumb", "")
-                if not t:
-                    continue
-                head = client.get_bytes(t)[:220]
-                if not detect_corrupt_thumb_header(head):
-                    album_thumb = t
-                    break
+            if not need_fix:
+                continue
 
-            if album_thumb:
-                client.post_url_poster(aid, f"{args.base_url.rstrip('/')}{album_thumb}?X-Plex-Token={args.token}")
-                source = f"album_thumb:{album_thumb}"
-            else:
-                # 2) local image from artist location
-                meta = client.get_xml(f"/library/metadata/{aid}")
-                md = meta.find("Directory")
-                loc = ""
-                if md is not None:
-                    ln = md.find("Location")
-                    if ln is not None:
-                        loc = ln.attrib.get("path", "")
-                host_loc = apply_maps(loc, maps)
-
-                images = []
-                if host_loc and os.path.isdir(host_loc):
-                    for root_dir, _dirs, files in os.walk(host_loc):
-                        depth = root_dir.count(os.sep) - host_loc.count(os.sep)
-                        if depth > args.max_image_depth:
-                            continue
-                        for fn in files:
-                            if fn.lower().endswith((".jpg", ".jpeg", ".png", ".webp")):
-                                images.append(os.path.join(root_dir, fn))
-
-                if images:
-                    best = choose_best_image(images, host_loc)
-                    client.post_raw_poster(aid, best)
-                    source = f"file:{best}"
-                elif args.generate_missing:
-                    try:
-                        from PIL import Image, ImageDraw, ImageFont
+            source = ""
 
+            try:
+                # 1) album thumb
+                _mc, albums = fetch_records(client, f"/library/metadata/{aid}/children")
+                album_thumb = ""
+                for alb in albums:
+                    t = alb.thumb
+                    if not t:
+                        continue
+                    head = client.get_bytes(t)[:220]
+                    if not detect_corrupt_thumb_header(head):
+                        album_thumb = t
+                        break
+
+                if album_thumb:
+                    client.post_url_poster(aid, f"{args.base_url.rstrip('/')}{album_thumb}?X-Plex-Token={args.token}")
+                    source = f"album_thumb:{album_thumb}"
+                else:
+                    # 2) local image from artist location
+                    _mc, meta = fetch_records(client, f"/library/metadata/{aid}")
+                    loc = meta[0].location if meta else ""
+                    host_loc = apply_maps(loc, maps)
+
+                    images = []
+                    if host_loc and os.path.isdir(host_loc):
+                        for root_dir, _dirs, files in os.walk(host_loc):
+                            depth = root_dir.count(os.sep) - host_loc.count(os.sep)
+                            if depth > args.max_image_depth:
+                                continue
+                            for fn in files:
+                                if fn.lower().endswith((".jpg", ".jpeg", ".png", ".webp")):
+                                    images.append(os.path.join(root_dir, fn))
+
+                    if images:
+                        best = choose_best_image(images, host_loc)
+                        client.post_raw_poster(aid, best)
+                        source = f"file:{best}"
+                    elif args.generate_missing:
                         gen = os.path.join(args.tmp_dir, f"artist_{aid}_generated.jpg")
                         os.makedirs(args.tmp_dir, exist_ok=True)
-                        img = Image.new("RGB", (1500, 1500), (17, 22, 35))
-                        draw = ImageDraw.Draw(img)
+                        if args.render_workers > 0:
+                            if pool is None:
+                                pool = start_render_pool(args.render_workers)
+                            fut = pool.submit(
+                                render_generated_poster, title, gen, args.poster_size, args.poster_quality
+                            )
+                            pending[fut] = (aid, title, thumb)
+                            continue
                         try:
-                            f1 = ImageFont.truetype("/usr/share/fonts/TTF/DejaVuSans-Bold.ttf", 110)
-                            f2 = ImageFont.truetype("/usr/share/fonts/TTF/DejaVuSans.ttf", 36)
-                        except Exception:
-                            f1 = ImageFont.load_default()
-                            f2 = ImageFont.load_default()
-                        title_wrapped = title.replace(" - ", "\n")
-                        bb = draw.multiline_textbbox((0, 0), title_wrapped, font=f1, spacing=16, align="center")
-                        tw, th = bb[2] - bb[0], bb[3] - bb[1]
-                        draw.multiline_text(((1500 - tw) // 2, (1500 - th) // 2), title_wrapped, fill=(106, 216, 255), font=f1, spacing=16, align="center")
-                        draw.text((120, 1380), "Generated cover", fill=(200, 200, 220), font=f2)
-                        img.save(gen, "JPEG", quality=95)
+                            render_generated_poster(title, gen, args.poster_size, args.poster_quality)
+                        except Exception as ge:
+                            raise RuntimeError(f"generate_failed: {ge}")
                         client.post_raw_poster(aid, gen)
                         source = f"generated:{gen}"
-                    except Exception as ge:
-                        raise RuntimeError(f"generate_failed: {ge}")
-                else:
-                    source = "none"
-
-            new_thumb = client.get_xml(f"/library/metadata/{aid}").find("Directory").attrib.get("thumb", "")
-            if new_thumb:
-                new_head = client.get_bytes(new_thumb)[:220]
-                if is_valid_image_header(new_head) and not detect_corrupt_thumb_header(new_head):
-                    status = "fixed"
-                    fixed += 1
-                else:
-                    status = "failed_after_apply"
-            else:
-                status = "failed_no_thumb"
+                    else:
+                        source = "none"
 
-            rows.append([aid, title, thumb, source, status, ""])
-        except Exception as e:
-            error = str(e)
-            rows.append([aid, title, thumb, source, "error", error])
+                finish(aid, title, thumb, source)
+            except Exception as e:
+                rows.append([aid, title, thumb, source, "error", str(e)])
+            finally:
+                if pending:
+                    done, _not_done = wait(list(pending), timeout=0, return_when=FIRST_COMPLETED)
+                    upload_rendered(done)
+        while pending:
+            done, _not_done = wait(list(pending), return_when=FIRST_COMPLETED)
+            upload_rendered(done)
+    finally:
+        for fut in pending:
+            fut.cancel()
+        if pool is not None and pool is not render_pool:
+            pool.shutdown(cancel_futures=True)
+
+    if applied:
+        verdicts = verify_applied_posters(
+            client,
+            args.section,
+            {aid: thumb for aid, (_pos, thumb) in applied.items()},
+            args.verify_retries,
+            args.verify_backoff,
+            args.verify_workers,
+            no_retry={aid for aid, (pos, _thumb) in applied.items() if rows[pos][3] == "none"},
+        )
+        for aid, (pos, _thumb) in applied.items():
+            rows[pos][4], rows[pos][5] = verdicts[aid]
+            if rows[pos][4] == "fixed":
+                fixed += 1
+    return rows, fixed
+
+
+REPAIR_HEADER = ["artist_id", "title", "old_thumb", "source", "status", "error"]
+
+
+def cmd_repair_artist_posters(args):
+    import csv
+
+    targets = resolve_targets(args)
+    if len(targets) > 1:
+        for label, target_args in targets:
+            target_args.tmp_dir = os.path.join(args.tmp_dir, re.sub(r"[^\w.-]+", "_", label))
+        # One pool for all targets, started here rather than per target thread.
+        render_pool = None
+        if args.generate_missing and args.render_workers > 0:
+            render_pool = start_render_pool(args.render_workers)
+
+        def job(target_args):
+            rows, fixed = repair_artist_posters(target_args, render_pool)
+            return {"fixed": fixed, "rows": len(rows)}, rows
+
+        try:
+            results = run_targets(targets, job)
+        finally:
+            if render_pool is not None:
+                render_pool.shutdown(cancel_futures=True)
+        report_targets(args, results, REPAIR_HEADER)
+        return
 
+    rows, fixed = repair_artist_posters(targets[0][1])
     with open(args.out_csv, "w", newline="", encoding="utf-8") as f:
         w = csv.writer(f)
-        w.writerow(["artist_id", "title", "old_thumb", "source", "status", "error"])
+        w.writerow(REPAIR_HEADER)
         w.writerows(rows)
 
+    if args.shard:
+        print(f"shard={args.shard[0]}/{args.shard[1]}")
     print(f"fixed={fixed}")
     print(f"rows={len(rows)}")
     print(f"csv={args.out_csv}")
 
 
+def classify_artist_thumbs(client: PlexClient, artists, verdicts=None):
+    """Return one ``[artist_id, title, thumb, status]`` row per artist.
+
+    ``verdicts`` optionally caches thumb path -> status. Plex thumb paths end
+    in the poster's update timestamp, so a cached verdict holds until the
+    poster changes.
+    """
+    rows = []
+    for rid, title, thumb in artists:
+        if not thumb:
+            rows.append([rid, title, thumb, "missing_thumb"])
+            continue
+        status = verdicts.get(thumb) if verdicts is not None else None
+        if status is None:
+            head = client.get_bytes(thumb)[:220]
+            status = "corrupt_thumb" if detect_corrupt_thumb_header(head) else "ok"
+            if verdicts is not None:
+                verdicts[thumb] = status
+        rows.append([rid, title, thumb, status])
+    return rows
+
+
 def cmd_verify_artists(args):
-    client = PlexClient(args.base_url, args.token, args.timeout)
-    root = load_all_artists(client, args.section)
+    if args.service:
+        if args.index_db or args.target:
+            raise SystemExit("--service cannot be combined with --index-db or --target")
+        params = {"section": args.section}
+        if args.shard:
+            params["shard"] = f"{args.shard[0]}/{args.shard[1]}"
+        result = service_request(args.service, "/verify", params)
+        report_verify_artists(args, result["artists_total"], result["rows"])
+        return
 
-    missing = []
-    corrupt = []
+    targets = resolve_targets(args)
+    if len(targets) > 1:
+        if args.index_db:
+            raise SystemExit("--index-db holds one server's sections; run verify-artists per target")
 
-    for d in root.findall("Directory"):
-        rid = d.attrib.get("ratingKey", "")
-        title = d.attrib.get("title", "")
-        thumb = d.attrib.get("thumb", "")
+        def job(target_args):
+            total, rows = collect_verify_artists(target_args)
+            counts = Counter(r[3] for r in rows)
+            summary = {"artists_total": int(total)}
+            summary.update((k, counts.get(k, 0)) for k in ("missing_thumb", "corrupt_thumb"))
+            return summary, rows
 
-        if not thumb:
-            missing.append((rid, title))
-            continue
+        report_targets(args, run_targets(targets, job), VERIFY_HEADER)
+        return
+
+    report_verify_artists(args, *collect_verify_artists(targets[0][1]))
 
-        head = client.get_bytes(thumb)[:220]
-        if detect_corrupt_thumb_header(head):
-            corrupt.append((rid, title))
 
-    print(f"artists_total={root.attrib.get('size', '0')}")
+def collect_verify_artists(args):
+    """Return ``(artists_total, rows)`` for one section (see ``classify_artist_thumbs``)."""
+    client = make_client(args)
+    if args.index_db:
+        artists = open_index(args.index_db).execute(
+            "SELECT rating_key, title, thumb FROM artists WHERE section = ? ORDER BY title_lower",
+            (args.section,),
+        ).fetchall()
+        total = str(len(artists))
+    else:
+        mc, records = list_artists(client, args.section)
+        artists = [(a.rating_key, a.title, a.thumb) for a in records]
+        total = str(mc.get("size", "0"))
+    if args.shard:
+        artists = [a for a in artists if in_shard(a[0], args.shard)]
+        total = str(len(artists))
+    return total, classify_artist_thumbs(client, artists)
+
+
+VERIFY_HEADER = ["artist_id", "title", "thumb", "status"]
+
+
+def report_verify_artists(args, total, rows):
+    import csv
+
+    missing = [(r[0], r[1]) for r in rows if r[3] == "missing_thumb"]
+    corrupt = [(r[0], r[1]) for r in rows if r[3] == "corrupt_thumb"]
+
+    if args.out_csv:
+        with open(args.out_csv, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(VERIFY_HEADER)
+            w.writerows(rows)
+
+    if args.shard:
+        print(f"shard={args.shard[0]}/{args.shard[1]}")
+    print(f"artists_total={total}")
     print(f"missing_thumb={len(missing)}")
     print(f"corrupt_thumb={len(corrupt)}")
 
@@ -632,6 +2307,442 @@ def cmd_verify_artists(args):
         print("corrupt_examples:")
         for rid, title in corrupt[: args.show]:
             print(f"  {rid} | {title}")
+    if args.out_csv:
+        print(f"csv={args.out_csv}")
+
+
+def read_summary(path: str):
+    """Read ``key=value`` lines from a saved command summary (other lines are skipped)."""
+    out = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line[:1].isspace() or "=" not in line:
+                continue
+            key, value = line.rstrip("\n").split("=", 1)
+            out[key] = value
+    return out
+
+
+def merge_summaries(summaries):
+    """Sum integer counters across shards; other values are kept only when all shards agree."""
+    totals = {}
+    text = {}
+    for summary in summaries:
+        for key, value in summary.items():
+            if key == "shard":
+                continue
+            if re.fullmatch(r"-?\d+", value):
+                totals[key] = totals.get(key, 0) + int(value)
+            else:
+                text.setdefault(key, set()).add(value)
+    merged = {k: str(v) for k, v in totals.items()}
+    for key, values in text.items():
+        if len(values) == 1 and key not in merged:
+            merged[key] = values.pop()
+    return merged
+
+
+def cmd_merge_reports(args):
+    import csv
+
+    header = None
+    rows = []
+    for path in args.in_csv:
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            file_header = next(reader, None)
+            if file_header is None:
+                continue
+            if header is None:
+                header = file_header
+            elif file_header != header:
+                raise SystemExit(f"CSV header mismatch in {path}: {','.join(file_header)}")
+            rows.extend(reader)
+
+    if header is not None:
+        with open(args.out_csv, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(header)
+            w.writerows(rows)
+
+    print(f"inputs={len(args.in_csv)}")
+    print(f"rows={len(rows)}")
+    if header and "status" in header:
+        col = header.index("status")
+        counts = Counter(r[col] for r in rows if len(r) > col)
+        for k in sorted(counts):
+            print(f"status_{k}={counts[k]}")
+    if args.summary:
+        merged = merge_summaries(read_summary(p) for p in args.summary)
+        merged.pop("csv", None)
+        for k in sorted(merged):
+            print(f"{k}={merged[k]}")
+    print(f"csv={args.out_csv}")
+
+
+DUPLICATE_PARTIAL_BYTES = 64 * 1024
+DUPLICATE_HASH_CHUNK = 1024 * 1024
+
+
+def audio_payload_range(path: str, size: int):
+    """Return ``(start, end)`` of a file's audio payload, leaving out tag blocks.
+
+    Skips a leading ID3v2 tag, FLAC metadata blocks, and trailing APEv2/ID3v1
+    tags so that copies of the same audio with different tags compare equal.
+    """
+    start, end = 0, size
+    with open(path, "rb") as f:
+        head = f.read(10)
+        if len(head) == 10 and head[:3] == b"ID3":
+            start = 10 + ((head[6] & 0x7F) << 21 | (head[7] & 0x7F) << 14 | (head[8] & 0x7F) << 7 | (head[9] & 0x7F))
+            if head[5] & 0x10:
+                start += 10
+        elif head[:4] == b"fLaC":
+            pos = 4
+            while True:
+                f.seek(pos)
+                header = f.read(4)
+                if len(header) < 4:
+                    break
+                pos += 4 + int.from_bytes(header[1:4], "big")
+                if header[0] & 0x80:
+                    break
+            start = pos
+        if end - start >= 128:
+            f.seek(end - 128)
+            if f.read(3) == b"TAG":
+                end -= 128
+        if end - start >= 32:
+            f.seek(end - 32)
+            footer = f.read(32)
+            if footer[:8] == b"APETAGEX":
+                end -= int.from_bytes(footer[12:16], "little")
+                if int.from_bytes(footer[20:24], "little") & 0x80000000:
+                    end -= 32
+    start = min(start, size)
+    return start, max(start, end)
+
+
+def hash_file_range(path: str, start: int, end: int, partial: int = 0):
+    """blake2b of bytes ``[start, end)`` via mmap.
+
+    With ``partial`` set, only the first and last ``partial`` bytes of the
+    range are hashed (the whole range when it is not longer than both).
+    """
+    import hashlib
+    import mmap
+
+    h = hashlib.blake2b(digest_size=20)
+    if end <= start:
+        return h.hexdigest()
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        if partial and end - start > 2 * partial:
+            h.update(m[start : start + partial])
+            h.update(m[end - partial : end])
+        else:
+            for pos in range(start, end, DUPLICATE_HASH_CHUNK):
+                h.update(m[pos : min(pos + DUPLICATE_HASH_CHUNK, end)])
+    return h.hexdigest()
+
+
+def find_duplicate_groups(paths, audio_only: bool = False, workers: int = 8, partial: int = DUPLICATE_PARTIAL_BYTES):
+    """Group identical files: size buckets, then head/tail hashes, then full hashes.
+
+    Each tier only looks at files that still collide after the previous one.
+    Returns ``(groups, stats)`` where each group is ``(digest, length, paths)``.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    stats = Counter()
+
+    def measure(path):
+        try:
+            size = os.path.getsize(path)
+            return audio_payload_range(path, size) if audio_only else (0, size)
+        except OSError:
+            return None
+
+    def collisions(keyed):
+        buckets = {}
+        for path, key in keyed.items():
+            if key is not None:
+                buckets.setdefault(key, []).append(path)
+        return {key: group for key, group in buckets.items() if len(group) > 1}
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        ranges = dict(zip(paths, pool.map(measure, paths)))
+        stats["files"] = len(ranges)
+        stats["unreadable"] = sum(1 for r in ranges.values() if r is None)
+
+        def hash_all(candidates, part):
+            def one(path):
+                try:
+                    return hash_file_range(path, *ranges[path], part)
+                except (OSError, ValueError):
+                    return None
+
+            hashes = dict(zip(candidates, pool.map(one, candidates)))
+            stats["unreadable"] += sum(1 for h in hashes.values() if h is None)
+            return hashes
+
+        by_length = collisions({p: r[1] - r[0] for p, r in ranges.items() if r is not None and r[1] > r[0]})
+        candidates = [p for group in by_length.values() for p in group]
+        stats["size_candidates"] = len(candidates)
+
+        partial_hashes = hash_all(candidates, partial)
+        stats["partial_hashed"] = len(candidates)
+        by_partial = collisions(
+            {p: (ranges[p][1] - ranges[p][0], h) for p, h in partial_hashes.items() if h is not None}
+        )
+
+        # Ranges no longer than head+tail were hashed in full already.
+        need_full = [p for (length, _h), group in by_partial.items() if length > 2 * partial for p in group]
+        full_hashes = hash_all(need_full, 0)
+        stats["full_hashed"] = len(need_full)
+
+    final = {}
+    for (length, h), group in by_partial.items():
+        for p in group:
+            digest = full_hashes.get(p, h) if length > 2 * partial else h
+            if digest is not None:
+                final[p] = (length, digest)
+    groups = [(digest, length, sorted(group)) for (length, digest), group in collisions(final).items()]
+    groups.sort(key=lambda g: (-g[1] * (len(g[2]) - 1), g[2][0]))
+    return groups, stats
+
+
+def cmd_find_duplicates(args):
+    import csv
+
+    maps = parse_map(args.path_map)
+    sources = {}
+    with open(args.in_csv, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            host = apply_maps(row["plex_file"], maps)
+            plex_file, track_ids = sources.setdefault(host, (row["plex_file"], []))
+            tid = row.get("track_id", "")
+            if tid and tid not in track_ids:
+                track_ids.append(tid)
+
+    groups, stats = find_duplicate_groups(list(sources), args.audio_only, args.workers, args.partial_bytes)
+
+    reclaimable = 0
+    with open(args.out_csv, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["group_id", "hash", "bytes", "path", "plex_file", "track_ids"])
+        for gid, (digest, length, paths) in enumerate(groups, 1):
+            reclaimable += length * (len(paths) - 1)
+            for path in paths:
+                plex_file, track_ids = sources[path]
+                w.writerow([gid, digest, length, path, plex_file, ",".join(track_ids)])
+
+    print(f"mode={'audio' if args.audio_only else 'file'}")
+    for key in ("files", "unreadable", "size_candidates", "partial_hashed", "full_hashed"):
+        print(f"{key}={stats[key]}")
+    print(f"duplicate_groups={len(groups)}")
+    print(f"duplicate_files={sum(len(g[2]) for g in groups)}")
+    print(f"reclaimable_bytes={reclaimable}")
+    print(f"csv={args.out_csv}")
+
+
+class ServiceState:
+    """Warm caches behind ``serve``: artist listing, per-artist track rows, thumb verdicts."""
+
+    def __init__(self, client: PlexClient, section: str, ttl: float):
+        import threading
+
+        self.client = client
+        self.section = section
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.requests = 0
+        self._artists = None
+        self._artists_at = 0.0
+        self.tracks = {}
+        self.verdicts = {}
+
+    def artists(self):
+        # Held across the listing so concurrent requests after expiry share one fetch.
+        with self.lock:
+            if self._artists is None or time.time() - self._artists_at > self.ttl:
+                _mc, self._artists = list_artists(self.client, self.section)
+                self._artists_at = time.time()
+            return self._artists
+
+    def track_rows(self, aid: str):
+        hit = self.tracks.get(aid)
+        if hit and time.time() - hit[0] <= self.ttl:
+            return hit[1]
+        rows = [list(r) for r in iter_api_artist_track_rows(self.client, aid)]
+        self.tracks[aid] = (time.time(), rows)
+        return rows
+
+    def invalidate(self):
+        with self.lock:
+            self._artists = None
+            self.tracks.clear()
+            self.verdicts.clear()
+
+    def verify(self, shard=None):
+        artists = [(a.rating_key, a.title, a.thumb) for a in self.artists() if in_shard(a.rating_key, shard)]
+        return {"artists_total": str(len(artists)), "rows": classify_artist_thumbs(self.client, artists, self.verdicts)}
+
+    def export(self, names, mode: str = "exact"):
+        index = ArtistNameIndex((a.rating_key, a.title) for a in self.artists())
+        found = index.match(names, mode)
+        return {"found": found, "tracks": {aid: self.track_rows(aid) for aid, _title in found}}
+
+    def health(self):
+        return {
+            "ok": True,
+            "section": self.section,
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "requests": self.requests,
+            "artists_cached": len(self._artists or []),
+            "artists_age_seconds": round(time.time() - self._artists_at, 1) if self._artists is not None else None,
+            "track_sets_cached": len(self.tracks),
+            "thumb_verdicts_cached": len(self.verdicts),
+        }
+
+    def handle(self, path: str, query):
+        """Dispatch one API request; returns a JSON-serialisable result or None for unknown paths.
+
+        Raises ValueError for bad requests, including a ``section`` parameter
+        that differs from the section this service was started for.
+        """
+        self.requests += 1
+        section = (query.get("section") or [self.section])[0]
+        if section != self.section:
+            raise ValueError(f"service holds section {self.section}, request asked for section {section}")
+        if path == "/health":
+            return self.health()
+        if path == "/artists":
+            return [[a.rating_key, a.title, a.thumb] for a in self.artists()]
+        if path == "/verify":
+            shard = parse_shard(query["shard"][0]) if query.get("shard") else None
+            return self.verify(shard)
+        if path == "/export":
+            mode = (query.get("name_match") or ["exact"])[0]
+            return self.export(query.get("name", []), mode)
+        if path == "/invalidate":
+            self.invalidate()
+            return {"ok": True}
+        return None
+
+
+def service_request(url: str, path: str, params=None, timeout: int = 600):
+    """Call a running ``plexh serve`` at ``http://host:port`` or ``unix:/path/to.sock``."""
+    import http.client
+    import json
+    import urllib.parse
+
+    query = urllib.parse.urlencode(params or {}, doseq=True)
+    target = f"{path}?{query}" if query else path
+    if url.startswith("unix:"):
+        import socket
+
+        conn = http.client.HTTPConnection("localhost", timeout=timeout)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        sock.connect(url[len("unix:") :])
+        conn.sock = sock
+    else:
+        parts = urllib.parse.urlsplit(url)
+        conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=timeout)
+    try:
+        conn.request("GET", target)
+        resp = conn.getresponse()
+        body = json.loads(resp.read() or b"null")
+    except OSError as e:
+        raise SystemExit(f"Service {url} unavailable: {e}")
+    finally:
+        conn.close()
+    if resp.status != 200:
+        raise SystemExit(f"Service {url}{path} failed: {(body or {}).get('error', resp.status)}")
+    return body
+
+
+def cmd_serve(args):
+    import json
+    import socketserver
+    import urllib.parse
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    state = ServiceState(make_client(args), args.section, args.cache_ttl)
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, fmt, *a):
+            pass
+
+        def _reply(self, code, body):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            u = urllib.parse.urlsplit(self.path)
+            try:
+                body = state.handle(u.path, urllib.parse.parse_qs(u.query))
+            except ValueError as e:
+                return self._reply(400, {"error": str(e)})
+            except Exception as e:
+                return self._reply(500, {"error": str(e)})
+            if body is None:
+                return self._reply(404, {"error": f"unknown endpoint {u.path}"})
+            self._reply(200, body)
+
+        do_POST = do_GET
+
+    if args.socket:
+        class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+            daemon_threads = True
+
+            def get_request(self):
+                request, _addr = super().get_request()
+                return request, ("unix", 0)
+
+        if os.path.exists(args.socket):
+            os.unlink(args.socket)
+        server = UnixHTTPServer(args.socket, Handler)
+        where = f"unix:{args.socket}"
+    else:
+        host, _sep, port = args.listen.rpartition(":")
+        server = ThreadingHTTPServer((host or "127.0.0.1", int(port)), Handler)
+        where = f"http://{host or '127.0.0.1'}:{server.server_address[1]}"
+
+    if not args.no_warm:
+        print(f"artists_cached={len(state.artists())}")
+    print(f"listening={where}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)
+
+
+def cmd_sync_index(args):
+    client = make_client(args)
+    conn = open_index(args.index_db)
+    counts, old_mark, new_mark = sync_index(client, conn, args.section, full=args.full, page_size=args.page_size)
+    totals = {
+        table: conn.execute(f"SELECT COUNT(*) FROM {table} WHERE section = ?", (args.section,)).fetchone()[0]
+        for _type, table in INDEX_TYPES
+    }
+    conn.close()
+
+    print(f"mode={'full' if args.full or old_mark == 0 else 'incremental'}")
+    for _type, table in INDEX_TYPES:
+        print(f"{table}_synced={counts[table]}")
+        print(f"{table}_total={totals[table]}")
+    print(f"watermark={new_mark}")
+    print(f"index_db={args.index_db}")
 
 
 def cmd_doctor(args):
@@ -673,7 +2784,7 @@ def cmd_doctor(args):
             raise SystemExit(2)
         return
 
-    client = PlexClient(args.base_url, args.token, args.timeout)
+    client = make_client(args)
 
     # 1) Connectivity + token
     try:
@@ -847,8 +2958,18 @@ def build_parser():
     )
     p.add_argument("--base-url", default=os.getenv("PLEX_BASE_URL", "http://127.0.0.1:32400"))
     p.add_argument("--token", default=os.getenv("PLEX_TOKEN", ""))
-    p.add_argument("--section", default=os.getenv("PLEX_MUSIC_SECTION", "6"))
+    p.add_argument(
+        "--section",
+        default=os.getenv("PLEX_MUSIC_SECTION", "6"),
+        help="Library section id (verify-artists and repair-artist-posters accept a comma-separated list)",
+    )
     p.add_argument("--timeout", type=int, default=60)
+    p.add_argument(
+        "--api-format",
+        choices=["xml", "json"],
+        default=os.getenv("HF_API_FORMAT", "xml"),
+        help="Plex response format; xml uses lxml when installed",
+    )
 
     sub = p.add_subparsers(dest="cmd", required=False)
 
@@ -858,8 +2979,32 @@ def build_parser():
     s0.set_defaults(func=cmd_wizard)
 
     s1 = sub.add_parser("export-artist-tracks")
-    s1.add_argument("--artist-names", required=True, help="Comma-separated names")
+    s1.add_argument(
+        "--artist-names",
+        default="",
+        help="Comma-separated names; glob:PATTERN (whole title) and re:REGEX entries are matched as patterns",
+    )
+    s1.add_argument("--artist-names-file", default="", help="File with one name/pattern per line")
+    s1.add_argument(
+        "--name-match",
+        choices=["exact", "normalized"],
+        default="exact",
+        help="normalized ignores case, diacritics, punctuation and leading/trailing articles",
+    )
+    s1.add_argument(
+        "--lookup",
+        choices=["auto", "filtered", "full"],
+        default="auto",
+        help="auto uses per-name server-side title filters for plain names, full lists the whole section",
+    )
+    s1.add_argument("--lookup-workers", type=int, default=8)
     s1.add_argument("--out-csv", required=True)
+    s1.add_argument("--index-db", default="", help="Resolve names and tracks from a sync-index database")
+    s1.add_argument(
+        "--service",
+        default=os.getenv("HF_SERVICE", ""),
+        help="Delegate to a running plexh serve (http://host:port or unix:/path)",
+    )
     s1.set_defaults(func=cmd_export_artist_tracks)
 
     s2 = sub.add_parser("retag-from-csv")
@@ -867,6 +3012,8 @@ def build_parser():
     s2.add_argument("--out-csv", required=True)
     s2.add_argument("--path-map", action="append", default=[], help="prefix map SRC=DST (repeatable)")
     s2.add_argument("--dry-run", action="store_true")
+    s2.add_argument("--shard", type=parse_shard, default=None, help="Only process shard i/N (split by album folder)")
+    s2.add_argument("--plan-out", default="", help="Write a replayable plan for apply (implies --dry-run)")
     s2.set_defaults(func=cmd_retag_from_csv)
 
     s3 = sub.add_parser("fix-track-numbers")
@@ -875,11 +3022,69 @@ def build_parser():
     s3.add_argument("--path-map", action="append", default=[], help="prefix map SRC=DST (repeatable)")
     s3.add_argument("--preserve-total", action="store_true", help="Preserve total when existing value is N/TOTAL")
     s3.add_argument("--dry-run", action="store_true")
+    s3.add_argument("--shard", type=parse_shard, default=None, help="Only process shard i/N (split by album folder)")
+    s3.add_argument("--plan-out", default="", help="Write a replayable plan for apply (implies --dry-run)")
     s3.set_defaults(func=cmd_fix_track_numbers)
 
+    s8 = sub.add_parser("fix-all")
+    s8.add_argument("--in-csv", required=True)
+    s8.add_argument("--out-csv", required=True)
+    s8.add_argument("--path-map", action="append", default=[], help="prefix map SRC=DST (repeatable)")
+    s8.add_argument(
+        "--fixers",
+        default="album,albumartist,tracknumber,preserve-total",
+        help="Comma-separated fixers: album, albumartist, tracknumber, preserve-total",
+    )
+    s8.add_argument("--dry-run", action="store_true")
+    s8.add_argument("--shard", type=parse_shard, default=None, help="Only process shard i/N (split by album folder)")
+    s8.add_argument("--plan-out", default="", help="Write a replayable plan for apply (implies --dry-run)")
+    s8.set_defaults(func=cmd_fix_all)
+
+    s12 = sub.add_parser("apply")
+    s12.add_argument("--plan", required=True, help="Plan CSV from --plan-out")
+    s12.add_argument("--out-csv", required=True)
+    s12.set_defaults(func=cmd_apply)
+
+    s11 = sub.add_parser("pipeline")
+    s11.add_argument("--artist-names", default="", help="Comma-separated names or glob:/re: patterns")
+    s11.add_argument("--artist-names-file", default="", help="File with one name/pattern per line")
+    s11.add_argument("--name-match", choices=["exact", "normalized"], default="exact")
+    s11.add_argument("--lookup", choices=["auto", "filtered", "full"], default="auto")
+    s11.add_argument("--lookup-workers", type=int, default=8)
+    s11.add_argument("--index-db", default="", help="Crawl from a sync-index database instead of the API")
+    s11.add_argument("--out-csv", required=True, help="Unified fix report")
+    s11.add_argument("--export-csv", default="", help="Also write the export rows as they are crawled")
+    s11.add_argument("--path-map", action="append", default=[], help="prefix map SRC=DST (repeatable)")
+    s11.add_argument("--fixers", default="album,albumartist,tracknumber,preserve-total")
+    s11.add_argument("--tag-workers", type=int, default=8)
+    s11.add_argument("--queue-size", type=int, default=1000, help="Max crawled rows waiting for tag workers")
+    s11.add_argument("--refresh-workers", type=int, default=2)
+    s11.add_argument("--no-refresh", action="store_true", help="Skip targeted folder refreshes")
+    s11.add_argument("--dry-run", action="store_true")
+    s11.set_defaults(func=cmd_pipeline)
+
+    s10 = sub.add_parser("watch")
+    s10.add_argument("--root", action="append", default=[], help="Host folder to watch (default: --path-map targets)")
+    s10.add_argument("--path-map", action="append", default=[], help="prefix map SRC=DST (repeatable)")
+    s10.add_argument("--fixers", default="album,albumartist,tracknumber,preserve-total")
+    s10.add_argument("--out-csv", default="reports/watch_log.csv", help="Report log, appended to")
+    s10.add_argument("--debounce-seconds", type=float, default=5.0, help="Quiet time before a file is processed")
+    s10.add_argument("--refresh-delay", type=float, default=15.0, help="Quiet time before a folder is refreshed")
+    s10.add_argument("--poll", action="store_true", help="Use polling even where inotify is available")
+    s10.add_argument("--poll-interval", type=float, default=30.0)
+    s10.add_argument("--no-refresh", action="store_true", help="Fix tags only, do not trigger Plex refreshes")
+    s10.add_argument("--run-seconds", type=float, default=0, help="Stop after this many seconds (0 runs forever)")
+    s10.add_argument("--dry-run", action="store_true")
+    s10.set_defaults(func=cmd_watch)
+
     s4 = sub.add_parser("cleanup-artists")
     s4.add_argument("--artist-ids", default="")
-    s4.add_argument("--artist-names", default="")
+    s4.add_argument("--artist-names", default="", help="Comma-separated names or glob:/re: patterns")
+    s4.add_argument("--artist-names-file", default="", help="File with one name/pattern per line")
+    s4.add_argument("--name-match", choices=["exact", "normalized"], default="exact")
+    s4.add_argument("--lookup", choices=["auto", "filtered", "full"], default="auto")
+    s4.add_argument("--lookup-workers", type=int, default=8)
+    s4.add_argument("--index-db", default="", help="Resolve --artist-names from a sync-index database")
     s4.add_argument("--scan-csv", default="")
     s4.add_argument(
         "--scan-root-prefix",
@@ -900,12 +3105,81 @@ def build_parser():
     s5.add_argument("--generate-missing", action="store_true")
     s5.add_argument("--max-image-depth", type=int, default=4)
     s5.add_argument("--tmp-dir", default="/tmp/plex_artist_generated")
+    s5.add_argument("--poster-size", type=int, default=1500, help="Generated poster width/height in pixels")
+    s5.add_argument("--poster-quality", type=int, default=95, help="JPEG quality for generated posters")
+    s5.add_argument(
+        "--render-workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Processes rendering generated posters (0 renders inline)",
+    )
+    s5.add_argument(
+        "--verify-mode",
+        choices=["deferred", "inline"],
+        default="deferred",
+        help="deferred checks all uploads in one batch at the end; inline checks after each upload",
+    )
+    s5.add_argument("--verify-retries", type=int, default=3, help="Extra deferred checks for posters not fixed yet")
+    s5.add_argument("--verify-backoff", type=float, default=2.0, help="Seconds before the first retry (doubles)")
+    s5.add_argument("--verify-workers", type=int, default=8, help="Concurrent thumb probes in deferred mode")
+    s5.add_argument("--shard", type=parse_shard, default=None, help="Only process shard i/N (split by artist id)")
+    s5.add_argument("--target", action="append", default=[], help="Server profile to run against (repeatable)")
+    s5.add_argument(
+        "--profiles", default=os.getenv("HF_PROFILES", "plexh_profiles.ini"), help="INI file with server profiles"
+    )
+    s5.add_argument("--max-per-server", type=int, default=2, help="Sections processed at once per server")
     s5.set_defaults(func=cmd_repair_artist_posters)
 
     s6 = sub.add_parser("verify-artists")
     s6.add_argument("--show", type=int, default=20)
+    s6.add_argument("--index-db", default="", help="Read the artist list from a sync-index database")
+    s6.add_argument("--out-csv", default="", help="Also write one row per artist")
+    s6.add_argument(
+        "--service",
+        default=os.getenv("HF_SERVICE", ""),
+        help="Delegate to a running plexh serve (http://host:port or unix:/path)",
+    )
+    s6.add_argument("--shard", type=parse_shard, default=None, help="Only process shard i/N (split by artist id)")
+    s6.add_argument("--target", action="append", default=[], help="Server profile to run against (repeatable)")
+    s6.add_argument(
+        "--profiles", default=os.getenv("HF_PROFILES", "plexh_profiles.ini"), help="INI file with server profiles"
+    )
+    s6.add_argument("--max-per-server", type=int, default=2, help="Sections processed at once per server")
     s6.set_defaults(func=cmd_verify_artists)
 
+    s14 = sub.add_parser("serve")
+    s14.add_argument("--listen", default="127.0.0.1:32499", help="host:port for the local HTTP API")
+    s14.add_argument("--socket", default="", help="Serve on a Unix socket instead of --listen")
+    s14.add_argument("--cache-ttl", type=float, default=300.0, help="Seconds before cached listings are refetched")
+    s14.add_argument("--no-warm", action="store_true", help="Do not list artists before accepting requests")
+    s14.set_defaults(func=cmd_serve)
+
+    s15 = sub.add_parser("find-duplicates")
+    s15.add_argument("--in-csv", required=True, help="Export CSV with plex_file (and track_id) columns")
+    s15.add_argument("--out-csv", required=True)
+    s15.add_argument("--path-map", action="append", default=[], help="prefix map SRC=DST (repeatable)")
+    s15.add_argument("--audio-only", action="store_true", help="Hash audio payload only, ignoring ID3/APE/FLAC tags")
+    s15.add_argument("--workers", type=int, default=8, help="Parallel hashing threads")
+    s15.add_argument(
+        "--partial-bytes",
+        type=int,
+        default=DUPLICATE_PARTIAL_BYTES,
+        help="Bytes hashed from each end before falling back to a full hash",
+    )
+    s15.set_defaults(func=cmd_find_duplicates)
+
+    s13 = sub.add_parser("merge-reports")
+    s13.add_argument("--in-csv", action="append", required=True, help="Per-shard report CSV (repeatable)")
+    s13.add_argument("--out-csv", required=True)
+    s13.add_argument("--summary", action="append", default=[], help="Saved key=value summary output (repeatable)")
+    s13.set_defaults(func=cmd_merge_reports)
+
+    s9 = sub.add_parser("sync-index")
+    s9.add_argument("--index-db", default=os.getenv("HF_INDEX_DB", "reports/plex_index.sqlite"))
+    s9.add_argument("--full", action="store_true", help="Rebuild the section instead of an incremental refresh")
+    s9.add_argument("--page-size", type=int, default=500)
+    s9.set_defaults(func=cmd_sync_index)
+
     s7 = sub.add_parser("doctor")
     s7.add_argument("--path-map", action="append", default=[], help="prefix map SRC=DST (repeatable)")
     s7.add_argument(
@@ -918,6 +3192,10 @@ def build_parser():
     return p
 
 
+# Commands that accept a comma-separated --section and server profiles.
+FAN_OUT_CMDS = {"verify-artists", "repair-artist-posters"}
+
+
 def main():
     parser = build_parser()
     args = parser.parse_args()
@@ -936,13 +3214,19 @@ def main():
         "repair-artist-posters",
         "verify-artists",
         "doctor",
+        "sync-index",
+        "pipeline",
+        "serve",
     }
     if args.cmd in api_cmds and args.server != "plex":
         raise SystemExit(
             f"--server {args.server} adapter is not implemented yet for API workflows. "
             "Use --server plex, or run retag-from-csv for server-agnostic file tag repair."
         )
-    if args.cmd in api_cmds and not args.token:
+    if "," in str(args.section) and args.cmd not in FAN_OUT_CMDS:
+        raise SystemExit(f"{args.cmd} takes a single --section; only {', '.join(sorted(FAN_OUT_CMDS))} accept a list")
+    delegated = getattr(args, "service", "") or getattr(args, "target", [])
+    if args.cmd in api_cmds and not args.token and not delegated:
         raise SystemExit("Missing --token or PLEX_TOKEN")
     args.func(args)
 
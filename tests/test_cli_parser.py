@@ -18,10 +18,18 @@ class TestCliParser(unittest.TestCase):
                 "export-artist-tracks",
                 "retag-from-csv",
                 "fix-track-numbers",
+                "fix-all",
                 "cleanup-artists",
                 "repair-artist-posters",
                 "verify-artists",
                 "doctor",
+                "sync-index",
+                "watch",
+                "pipeline",
+                "apply",
+                "merge-reports",
+                "serve",
+                "find-duplicates",
                 "wizard",
             }.issubset(commands)
         )
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+
+from plex_music_hygiene.cli import audio_payload_range, find_duplicate_groups, hash_file_range
+
+
+def id3v2(payload: bytes) -> bytes:
+    n = len(payload)
+    size = bytes([(n >> 21) & 0x7F, (n >> 14) & 0x7F, (n >> 7) & 0x7F, n & 0x7F])
+    return b"ID3\x04\x00\x00" + size + payload
+
+
+def flac(comment: bytes, audio: bytes) -> bytes:
+    streaminfo = b"\x00" + (34).to_bytes(3, "big") + b"\x11" * 34
+    vorbis = bytes([0x80 | 4]) + len(comment).to_bytes(3, "big") + comment
+    return b"fLaC" + streaminfo + vorbis + audio
+
+
+class TestDuplicates(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write(self, name, data):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_payload_range_skips_id3_flac_and_trailing_tags(self):
+        audio = b"\xff\xfb" + b"a" * 500
+        mp3 = self.write("a.mp3", id3v2(b"T" * 40) + audio + b"TAG" + b"\x00" * 125)
+        self.assertEqual(audio_payload_range(mp3, os.path.getsize(mp3)), (50, 50 + len(audio)))
+        fl = self.write("a.flac", flac(b"c" * 20, b"frames"))
+        size = os.path.getsize(fl)
+        self.assertEqual(audio_payload_range(fl, size), (size - 6, size))
+
+    def test_partial_hash_only_reads_head_and_tail(self):
+        a = self.write("a.bin", b"x" * 10 + b"1" * 100 + b"y" * 10)
+        b = self.write("b.bin", b"x" * 10 + b"2" * 100 + b"y" * 10)
+        self.assertEqual(hash_file_range(a, 0, 120, 10), hash_file_range(b, 0, 120, 10))
+        self.assertNotEqual(hash_file_range(a, 0, 120), hash_file_range(b, 0, 120))
+
+    def test_tiers_separate_middle_differences_and_find_true_copies(self):
+        same = b"x" * 10 + b"1" * 100 + b"y" * 10
+        paths = [
+            self.write("a.bin", same),
+            self.write("b.bin", same),
+            self.write("c.bin", b"x" * 10 + b"2" * 100 + b"y" * 10),
+            self.write("d.bin", b"other size"),
+            os.path.join(self.tmp.name, "missing.bin"),
+        ]
+        groups, stats = find_duplicate_groups(paths, workers=2, partial=10)
+        self.assertEqual([g[2] for g in groups], [sorted(paths[:2])])
+        self.assertEqual((stats["size_candidates"], stats["full_hashed"], stats["unreadable"]), (3, 3, 1))
+
+    def test_audio_only_matches_copies_with_different_tags(self):
+        audio = b"\xff\xfb" + os.urandom(300)
+        a = self.write("a.mp3", id3v2(b"A" * 20) + audio)
+        b = self.write("b.mp3", id3v2(b"B" * 90) + audio + b"TAG" + b"\x00" * 125)
+        self.assertEqual(find_duplicate_groups([a, b], workers=2)[0], [])
+        groups, _stats = find_duplicate_groups([a, b], audio_only=True, workers=2)
+        self.assertEqual(len(groups), 1)
+        self.assertEqual(groups[0][1], len(audio))
+
+
+if __name__ == "__main__":
+    unittest.main()
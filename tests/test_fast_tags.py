@@ -0,0 +1,54 @@
+import os
+import struct
+import tempfile
+import unittest
+
+from plex_music_hygiene.cli import read_flac_comments, read_tags_fast
+
+
+def _block(block_type, payload, last=False):
+    return bytes([(0x80 if last else 0) | block_type]) + len(payload).to_bytes(3, "big") + payload
+
+
+def _vorbis_comment(entries):
+    vendor = b"test"
+    out = struct.pack("<I", len(vendor)) + vendor + struct.pack("<I", len(entries))
+    for e in entries:
+        raw = e.encode("utf-8")
+        out += struct.pack("<I", len(raw)) + raw
+    return out
+
+
+class TestFastTagRead(unittest.TestCase):
+    def _write(self, data, suffix=".flac"):
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_flac_comments_are_read_past_picture_blocks(self):
+        data = (
+            b"fLaC"
+            + _block(0, b"\x00" * 34)
+            + _block(6, b"\x00" * 200_000)
+            + _block(4, _vorbis_comment(["ALBUM=Now 42", "AlbumArtist=Now 42", "TRACKNUMBER=3/12"]), last=True)
+        )
+        tags = read_flac_comments(self._write(data))
+        self.assertEqual(tags["album"], ["Now 42"])
+        self.assertEqual(tags["albumartist"], ["Now 42"])
+        self.assertEqual(tags.get("tracknumber"), ["3/12"])
+
+    def test_flac_without_comment_block_has_empty_tags(self):
+        data = b"fLaC" + _block(0, b"\x00" * 34, last=True)
+        self.assertEqual(read_flac_comments(self._write(data)), {})
+
+    def test_non_plain_flac_falls_back(self):
+        self.assertIsNone(read_tags_fast(self._write(b"ID3\x04\x00\x00\x00\x00\x00\x00fLaC")))
+
+    def test_unknown_extension_has_no_fast_path(self):
+        self.assertIsNone(read_tags_fast(self._write(b"\x00" * 16, suffix=".m4a")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+
+from plex_music_hygiene.cli import parse_fixers, plan_tag_changes
+
+
+class TestFixAllPipeline(unittest.TestCase):
+    def test_parse_fixers_uses_canonical_order(self):
+        self.assertEqual(
+            parse_fixers("preserve-total, tracknumber,album"),
+            ["album", "tracknumber", "preserve-total"],
+        )
+
+    def test_parse_fixers_rejects_unknown_names(self):
+        with self.assertRaises(ValueError):
+            parse_fixers("album,genre")
+
+    def test_plan_combines_all_fixers_in_one_change_set(self):
+        before = {"album": "Various Artists", "albumartist": "V.A.", "tracknumber": "7/12"}
+        ctx = {"expected": "Now 42", "desired_tracknumber": 3}
+        changes = plan_tag_changes(before, parse_fixers("album,albumartist,tracknumber,preserve-total"), ctx)
+        self.assertEqual(changes, {"album": "Now 42", "albumartist": "Now 42", "tracknumber": "3/12"})
+
+    def test_plan_is_empty_when_file_already_matches(self):
+        before = {"album": "Now 42", "albumartist": "Now 42", "tracknumber": "3/12"}
+        ctx = {"expected": "Now 42", "desired_tracknumber": 3}
+        self.assertEqual(plan_tag_changes(before, parse_fixers("album,albumartist,tracknumber"), ctx), {})
+
+    def test_tracknumber_without_preserve_total_drops_total(self):
+        before = {"album": "", "albumartist": "", "tracknumber": "7/12"}
+        ctx = {"expected": "X", "desired_tracknumber": 3}
+        self.assertEqual(plan_tag_changes(before, ["tracknumber"], ctx), {"tracknumber": "3"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+import xml.etree.ElementTree as ET
+
+from plex_music_hygiene.cli import (
+    index_artist_track_rows,
+    index_find_artists_by_name,
+    open_index,
+    sync_index,
+)
+
+
+ARTISTS = [
+    '<Directory ratingKey="1" title="Various Artists" thumb="" addedAt="100" updatedAt="100"/>',
+    '<Directory ratingKey="2" title="V.A." thumb="/t/2" addedAt="100" updatedAt="150"/>',
+]
+ALBUMS = ['<Directory ratingKey="10" title="Now 42" parentRatingKey="2" thumb="" addedAt="100" updatedAt="100"/>']
+TRACKS = [
+    '<Track ratingKey="{rk}" title="Song {rk}" index="{idx}" parentRatingKey="10" grandparentRatingKey="2" '
+    'addedAt="100" updatedAt="{upd}"><Media><Part file="/Music/Now 42/{idx:02d} - Song.flac"/></Media></Track>'.format(
+        rk=100 + i, idx=i, upd=100 + i
+    )
+    for i in range(1, 4)
+]
+
+
+class FakeClient:
+    """Follows Plex filter semantics: ``field>>=value`` keeps items with field strictly greater."""
+
+    def __init__(self, albums=ALBUMS, total_size=True):
+        self.calls = []
+        self.albums = albums
+        self.total_size = total_size
+
+    def get_xml(self, path, params=None):
+        params = dict(params or {})
+        self.calls.append(params)
+        items = {"8": ARTISTS, "9": self.albums, "10": TRACKS}[params["type"]]
+        for key, value in params.items():
+            if key.endswith(">>"):
+                field = key[:-2]
+                items = [x for x in items if int(ET.fromstring(x).attrib[field]) > value]
+        start = params["X-Plex-Container-Start"]
+        page = items[start : start + params["X-Plex-Container-Size"]]
+        total = f' totalSize="{len(items)}"' if self.total_size else ""
+        return ET.fromstring(f'<MediaContainer size="{len(page)}"{total}>{"".join(page)}</MediaContainer>')
+
+
+class TestLibraryIndex(unittest.TestCase):
+    def setUp(self):
+        self.conn = open_index(":memory:")
+
+    def test_full_sync_pages_and_answers_local_queries(self):
+        counts, old_mark, new_mark = sync_index(FakeClient(), self.conn, "6", page_size=2)
+        self.assertEqual((counts["artists"], counts["albums"], counts["tracks"]), (2, 1, 3))
+        self.assertEqual((old_mark, new_mark), (0, 150))
+        self.assertEqual(index_find_artists_by_name(self.conn, "6", ["v.a."]), [("2", "V.A.")])
+        rows = list(index_artist_track_rows(self.conn, "2"))
+        self.assertEqual([r[2] for r in rows], ["101", "102", "103"])
+        self.assertEqual(rows[0][4], "/Music/Now 42/01 - Song.flac")
+
+    def test_pages_without_total_size_continue_until_a_short_page(self):
+        counts, _old_mark, _new_mark = sync_index(FakeClient(total_size=False), self.conn, "6", page_size=2)
+        self.assertEqual((counts["artists"], counts["albums"], counts["tracks"]), (2, 1, 3))
+
+    def test_incremental_sync_uses_watermark_filters(self):
+        sync_index(FakeClient(), self.conn, "6")
+        client = FakeClient()
+        counts, old_mark, _new_mark = sync_index(client, self.conn, "6")
+        self.assertEqual(old_mark, 150)
+        self.assertTrue(all("updatedAt>>" in c or "addedAt>>" in c for c in client.calls))
+        self.assertEqual(counts["artists"], 1)
+        self.assertEqual(counts["tracks"], 0)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM tracks").fetchone()[0], 3)
+
+    def test_incremental_sync_picks_up_items_updated_in_the_watermark_second(self):
+        sync_index(FakeClient(), self.conn, "6")
+        late = '<Directory ratingKey="11" title="Late" parentRatingKey="2" thumb="" addedAt="150" updatedAt="150"/>'
+        counts, old_mark, _new_mark = sync_index(FakeClient(ALBUMS + [late]), self.conn, "6")
+        self.assertEqual(old_mark, 150)
+        self.assertEqual(counts["albums"], 1)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM albums").fetchone()[0], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
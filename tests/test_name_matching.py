@@ -0,0 +1,111 @@
+import io
+import threading
+import unittest
+import xml.etree.ElementTree as ET
+from contextlib import redirect_stderr
+
+from plex_music_hygiene.cli import (
+    FILTERED_LOOKUP_MAX_NAMES,
+    ArtistNameIndex,
+    find_artists_by_name,
+    normalize_artist_name,
+)
+
+
+ARTISTS = [
+    ("1", "Various Artists"),
+    ("2", "V.A."),
+    ("3", "The Beatles"),
+    ("4", "Beatles, The"),
+    ("5", "Björk"),
+    ("6", "Bjork"),
+    ("7", "Verschillende artiesten"),
+]
+
+
+class TestNameMatching(unittest.TestCase):
+    def test_normalize_folds_case_diacritics_punctuation_and_articles(self):
+        self.assertEqual(normalize_artist_name("Björk"), "bjork")
+        self.assertEqual(normalize_artist_name("V. A."), "va")
+        self.assertEqual(normalize_artist_name("The Beatles"), "beatles")
+        self.assertEqual(normalize_artist_name("Beatles, The"), "beatles")
+        self.assertEqual(normalize_artist_name("The The"), "the")
+
+    def test_exact_mode_keeps_case_insensitive_title_semantics(self):
+        index = ArtistNameIndex(ARTISTS)
+        self.assertEqual(index.match(["v.a.", "bjork"]), [("2", "V.A."), ("6", "Bjork")])
+
+    def test_normalized_mode_groups_variants(self):
+        index = ArtistNameIndex(ARTISTS)
+        self.assertEqual(
+            [rk for rk, _ in index.match(["beatles", "BJÖRK", "va"], mode="normalized")],
+            ["2", "3", "4", "5", "6"],
+        )
+
+    def test_globs_and_regexes_are_matched_in_one_pass(self):
+        index = ArtistNameIndex(ARTISTS)
+        found = index.match(["glob:Various*", "re:^verschillende\\b", "glob:v.?."])
+        self.assertEqual([rk for rk, _ in found], ["1", "2", "7"])
+
+    def test_globs_match_the_whole_title(self):
+        index = ArtistNameIndex(ARTISTS + [("8", "The Various Artists Band"), ("9", "Dev.A.")])
+        self.assertEqual(index.match(["glob:Various*"]), [("1", "Various Artists")])
+        self.assertEqual(index.match(["glob:v.?."]), [("2", "V.A.")])
+
+    def test_names_with_glob_characters_stay_exact(self):
+        index = ArtistNameIndex(ARTISTS + [("8", "Who?"), ("9", "Whom"), ("10", "[Unknown Artist]")])
+        self.assertEqual(index.match(["Who?"]), [("8", "Who?")])
+        self.assertEqual(index.match(["[Unknown Artist]"]), [("10", "[Unknown Artist]")])
+
+
+class FakeClient:
+    def __init__(self, fail_filtered=False):
+        self.fail_filtered = fail_filtered
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def get_xml(self, path, params=None):
+        params = dict(params or {})
+        with self.lock:
+            self.calls.append(params)
+        items = ARTISTS
+        if "title" in params:
+            if self.fail_filtered:
+                raise OSError("filter unsupported")
+            items = [a for a in ARTISTS if params["title"].lower() in a[1].lower()]
+        body = "".join(f'<Directory ratingKey="{rk}" title="{t}"/>' for rk, t in items)
+        return ET.fromstring(f"<MediaContainer>{body}</MediaContainer>")
+
+
+class TestArtistLookup(unittest.TestCase):
+    def test_plain_names_use_one_filtered_query_each(self):
+        client = FakeClient()
+        found = find_artists_by_name(client, "6", ["the beatles", "Bjork"])
+        self.assertEqual(found, [("3", "The Beatles"), ("6", "Bjork")])
+        self.assertEqual(sorted(c["title"] for c in client.calls), ["Bjork", "the beatles"])
+
+    def test_patterns_use_full_listing(self):
+        client = FakeClient()
+        self.assertEqual(len(find_artists_by_name(client, "6", ["glob:V*"])), 3)
+        self.assertEqual(len(client.calls), 1)
+        self.assertNotIn("title", client.calls[0])
+
+    def test_forced_filtered_lookup_reports_name_limit(self):
+        client = FakeClient()
+        err = io.StringIO()
+        names = [f"Artist {i}" for i in range(FILTERED_LOOKUP_MAX_NAMES + 1)]
+        with redirect_stderr(err):
+            find_artists_by_name(client, "6", names, lookup="filtered")
+        self.assertIn(f"exceed the filtered lookup limit of {FILTERED_LOOKUP_MAX_NAMES}", err.getvalue())
+        self.assertEqual(len(client.calls), 1)
+
+    def test_filtered_failure_falls_back_to_full_listing(self):
+        client = FakeClient(fail_filtered=True)
+        with redirect_stderr(io.StringIO()):
+            found = find_artists_by_name(client, "6", ["V.A."])
+        self.assertEqual(found, [("2", "V.A.")])
+        self.assertNotIn("title", client.calls[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
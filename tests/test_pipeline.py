@@ -0,0 +1,102 @@
+import argparse
+import io
+import os
+import random
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import ExitStack, redirect_stdout
+from unittest import mock
+
+from plex_music_hygiene import cli
+
+
+# artist id -> [(album_id, album_title, track_id, track_title, plex_file)]
+TRACKS = {
+    "1": [
+        ("10", "Now 42", "101", "A", "/Music/Now 42/01 - A.flac"),
+        ("10", "Now 42", "102", "B", "/Music/Now 42/02 - B.flac"),
+        ("11", "Broken", "111", "C", "/Music/Broken/01 - C.flac"),
+        ("11", "Broken", "112", "D", "/Music/Broken/02 - D.flac"),
+    ],
+    "2": [
+        ("20", "Clean", "201", "E", "/Music/Clean/01 - E.flac"),
+        ("20", "Clean", "202", "F", "/Music/Clean/02 - F.flac"),
+        ("20", "Clean", "203", "G", "/Music/Clean/03 - G.flac"),
+    ],
+}
+STATUS = {"Now 42": "updated", "Broken": "error", "Clean": "ok_already"}
+
+
+class FakeClient:
+    def __init__(self, events, lock):
+        self.events = events
+        self.lock = lock
+
+    def get(self, path, params=None):
+        with self.lock:
+            self.events.append(("refresh", params["path"]))
+
+
+class TestPipeline(unittest.TestCase):
+    def run_pipeline(self, **overrides):
+        events = []
+        lock = threading.Lock()
+
+        def fake_fix(host, expected, fixers, dry_run, plan=None):
+            time.sleep(random.uniform(0, 0.01))
+            with lock:
+                events.append(("fixed", os.path.dirname(host)))
+            return [host, STATUS[expected], expected, "", "", "", "", "", ""]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            args = argparse.Namespace(
+                section="6",
+                fixers="album",
+                path_map=[],
+                tag_workers=3,
+                queue_size=2,
+                refresh_workers=2,
+                no_refresh=False,
+                dry_run=False,
+                export_csv="",
+                out_csv=os.path.join(tmp, "out.csv"),
+            )
+            for k, v in overrides.items():
+                setattr(args, k, v)
+            found = [("1", "Artist One"), ("2", "Artist Two")]
+            with ExitStack() as stack:
+                stack.enter_context(mock.patch.object(cli, "mutagen_file", return_value=object()))
+                stack.enter_context(mock.patch.object(cli, "make_client", return_value=FakeClient(events, lock)))
+                stack.enter_context(
+                    mock.patch.object(cli, "resolve_export_source", return_value=(found, TRACKS.__getitem__))
+                )
+                stack.enter_context(mock.patch.object(cli, "fix_tag_file", side_effect=fake_fix))
+                out = stack.enter_context(redirect_stdout(io.StringIO()))
+                cli.cmd_pipeline(args)
+        return events, out.getvalue()
+
+    def test_each_successful_folder_is_refreshed_once_after_its_last_file(self):
+        events, out = self.run_pipeline()
+        refreshes = [folder for kind, folder in events if kind == "refresh"]
+        self.assertEqual(sorted(refreshes), ["/Music/Clean", "/Music/Now 42"])
+        for folder in refreshes:
+            last_fix = max(i for i, e in enumerate(events) if e == ("fixed", folder))
+            self.assertGreater(events.index(("refresh", folder)), last_fix)
+        self.assertIn("refreshed=2", out)
+        self.assertIn("error=2", out)
+
+    def test_folders_where_every_file_failed_are_not_refreshed(self):
+        events, _out = self.run_pipeline()
+        self.assertNotIn(("refresh", "/Music/Broken"), events)
+        self.assertEqual(sum(1 for kind, _f in events if kind == "fixed"), 7)
+
+    def test_dry_run_does_not_refresh(self):
+        events, out = self.run_pipeline(dry_run=True)
+        self.assertEqual([e for e in events if e[0] == "refresh"], [])
+        self.assertIn("refreshed=0", out)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import os
+import struct
+import tempfile
+import unittest
+
+try:
+    import mutagen
+except ImportError:
+    mutagen = None
+
+from plex_music_hygiene.cli import (
+    apply_planned_file,
+    file_fingerprint,
+    fix_tag_file,
+    parse_fixers,
+    plan_rows,
+    read_flac_comments,
+    read_plan,
+    write_plan,
+)
+
+
+def _block(block_type, payload, last=False):
+    return bytes([(0x80 if last else 0) | block_type]) + len(payload).to_bytes(3, "big") + payload
+
+
+def _vorbis_comment(entries):
+    vendor = b"test"
+    out = struct.pack("<I", len(vendor)) + vendor + struct.pack("<I", len(entries))
+    for e in entries:
+        raw = e.encode("utf-8")
+        out += struct.pack("<I", len(raw)) + raw
+    return out
+
+
+# 4096-sample blocks, 44.1 kHz, stereo, 16 bit, no frames.
+STREAMINFO = struct.pack(">HH", 4096, 4096) + b"\x00" * 6 + bytes([0x0A, 0xC4, 0x42, 0xF0]) + b"\x00" * 20
+
+
+class TestPlanApply(unittest.TestCase):
+    def test_plan_rows_one_per_changed_field(self):
+        rows = plan_rows("/m/a.flac", (10, 20), {"album": "Old", "albumartist": "Old"}, {"album": "New"})
+        self.assertEqual(rows, [["/m/a.flac", 10, 20, "album", "Old", "New"]])
+
+    def test_plan_roundtrip_groups_fields_by_path(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "plan.csv")
+            rows = plan_rows("/m/a.flac", (10, 20), {"album": "", "tracknumber": "7/12"}, {"album": "X", "tracknumber": "3/12"})
+            rows += plan_rows("/m/b.flac", (11, 21), {"album": "Y"}, {"album": "X"})
+            write_plan(path, rows)
+            plan = read_plan(path)
+        self.assertEqual(list(plan), ["/m/a.flac", "/m/b.flac"])
+        self.assertEqual(plan["/m/a.flac"], ((10, 20), {"album": ("", "X"), "tracknumber": ("7/12", "3/12")}))
+
+    def test_missing_file_is_reported(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            status, _ = apply_planned_file(os.path.join(tmp, "gone.flac"), (1, 2), {"album": ("A", "B")})
+        self.assertEqual(status, "missing")
+
+    def test_changed_unreadable_file_is_not_written(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "notes.txt")
+            with open(path, "wb") as f:
+                f.write(b"not audio")
+            size, mtime_ns = file_fingerprint(path)
+            status, _ = apply_planned_file(path, (size + 1, mtime_ns), {"album": ("A", "B")})
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), b"not audio")
+        self.assertIn(status, ("unreadable", "error"))
+
+
+@unittest.skipIf(mutagen is None, "mutagen not installed")
+class TestApplyRealFlac(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        folder = os.path.join(tmp.name, "Now 42")
+        os.mkdir(folder)
+        self.path = os.path.join(folder, "03 - Song.flac")
+        with open(self.path, "wb") as f:
+            f.write(b"fLaC" + _block(0, STREAMINFO) + _block(4, _vorbis_comment(["ALBUM=Old"]), last=True))
+        self.plan_path = os.path.join(tmp.name, "plan.csv")
+
+    def plan(self):
+        rows = []
+        status = fix_tag_file(self.path, "Now 42", parse_fixers("album"), dry_run=True, plan=rows)[1]
+        self.assertEqual(status, "would_update")
+        write_plan(self.plan_path, rows)
+        return read_plan(self.plan_path)[self.path]
+
+    def album(self):
+        return read_flac_comments(self.path).get("album")
+
+    def set_album(self, value):
+        audio = mutagen.File(self.path, easy=True)
+        audio["album"] = [value]
+        audio.save()
+
+    def touch(self):
+        st = os.stat(self.path)
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    def test_matching_fingerprint_writes_planned_values(self):
+        fingerprint, fields = self.plan()
+        self.assertEqual(fields, {"album": ("Old", "Now 42")})
+        self.assertEqual(self.album(), ["Old"])
+        self.assertEqual(apply_planned_file(self.path, fingerprint, fields), ("updated", ""))
+        self.assertEqual(self.album(), ["Now 42"])
+
+    def test_touched_file_is_reanalyzed_then_written(self):
+        fingerprint, fields = self.plan()
+        self.touch()
+        self.assertEqual(apply_planned_file(self.path, fingerprint, fields), ("updated_reanalyzed", ""))
+        self.assertEqual(self.album(), ["Now 42"])
+
+    def test_file_already_at_planned_value_is_left_alone(self):
+        fingerprint, fields = self.plan()
+        self.set_album("Now 42")
+        changed = file_fingerprint(self.path)
+        self.assertEqual(apply_planned_file(self.path, fingerprint, fields), ("ok_already", ""))
+        self.assertEqual(file_fingerprint(self.path), changed)
+
+    def test_conflicting_edit_is_not_overwritten(self):
+        fingerprint, fields = self.plan()
+        self.set_album("Hand Edited")
+        self.assertEqual(apply_planned_file(self.path, fingerprint, fields), ("stale_conflict", ""))
+        self.assertEqual(self.album(), ["Hand Edited"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import json
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+from plex_music_hygiene import cli
+from plex_music_hygiene.cli import fetch_records
+
+
+XML = """<MediaContainer size="1" totalSize="40">
+  <Track ratingKey="101" title="Song" thumb="/t/101" parentRatingKey="10" grandparentRatingKey="2"
+         index="3" addedAt="100" updatedAt="150">
+    <Media><Part file="/Music/Now 42/03 - Song.flac"/></Media>
+  </Track>
+</MediaContainer>"""
+
+JSON = {
+    "MediaContainer": {
+        "size": 1,
+        "totalSize": 40,
+        "Metadata": [
+            {
+                "ratingKey": "101",
+                "title": "Song",
+                "thumb": "/t/101",
+                "parentRatingKey": "10",
+                "grandparentRatingKey": "2",
+                "index": 3,
+                "addedAt": 100,
+                "updatedAt": 150,
+                "Media": [{"Part": [{"file": "/Music/Now 42/03 - Song.flac"}]}],
+            }
+        ],
+    }
+}
+
+
+class FakeClient:
+    def __init__(self, api_format):
+        self.api_format = api_format
+
+    def get_xml(self, path, params=None):
+        return ET.fromstring(XML)
+
+    def get_json(self, path, params=None):
+        return json.loads(json.dumps(JSON))["MediaContainer"]
+
+
+class TestPlexRecords(unittest.TestCase):
+    def test_xml_and_json_responses_yield_the_same_records(self):
+        out = {}
+        for fmt in ("xml", "json"):
+            mc, records = fetch_records(FakeClient(fmt), "/library/metadata/10/children")
+            self.assertEqual(int(mc["totalSize"]), 40)
+            self.assertEqual(len(records), 1)
+            r = records[0]
+            out[fmt] = (r.rating_key, r.title, r.thumb, r.parent_key, r.grandparent_key,
+                        r.index, r.added_at, r.updated_at, r.file)
+        self.assertEqual(out["xml"], out["json"])
+        self.assertEqual(out["json"][-1], "/Music/Now 42/03 - Song.flac")
+
+    def test_xml_parser_does_not_resolve_external_entities(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            secret = os.path.join(tmp, "secret.txt")
+            with open(secret, "w") as f:
+                f.write("s3cret")
+            doc = (
+                f'<?xml version="1.0"?><!DOCTYPE m [<!ENTITY x SYSTEM "file://{secret}">]>'
+                '<MediaContainer><Directory>&x;</Directory></MediaContainer>'
+            ).encode()
+            try:
+                root = cli.xml_fromstring()(doc)
+            except Exception:
+                return  # refusing the document is just as safe
+            self.assertNotIn("s3cret", root[0].text or "")
+
+
+if __name__ == "__main__":
+    unittest.main()
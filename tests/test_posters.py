@@ -0,0 +1,92 @@
+import os
+import tempfile
+import threading
+import unittest
+import xml.etree.ElementTree as ET
+
+try:
+    import PIL  # noqa: F401
+except ImportError:
+    PIL = None
+
+from plex_music_hygiene import cli
+
+
+@unittest.skipIf(PIL is None, "Pillow not installed")
+class TestGeneratedPosters(unittest.TestCase):
+    def test_render_honours_size_and_reuses_fonts(self):
+        from PIL import Image
+
+        with tempfile.TemporaryDirectory() as tmp:
+            out = os.path.join(tmp, "a.jpg")
+            cli.render_generated_poster("Various - Artists", out, size=300, quality=70)
+            fonts = cli.poster_fonts(300)
+            cli.render_generated_poster("Other", os.path.join(tmp, "b.jpg"), size=300, quality=70)
+            self.assertIs(cli.poster_fonts(300), fonts)
+            with Image.open(out) as img:
+                self.assertEqual((img.format, img.size), ("JPEG", (300, 300)))
+
+
+JPEG = b"\xff\xd8\xff\xe0" + b"\x00" * 64
+
+
+class FakePlex:
+    """Artist 1's upload becomes visible on the second check; artist 2 never gets a thumb."""
+
+    api_format = "xml"
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = []
+        self.checks = 0
+
+    def get_xml(self, path, params=None):
+        with self.lock:
+            self.calls.append(path)
+            if path.endswith("/all"):
+                self.checks += 1
+        thumb = "/library/metadata/1/thumb/2" if self.checks > 1 else "/library/metadata/1/thumb/1"
+        if path.endswith("/all"):
+            body = f'<Directory ratingKey="1" title="A" thumb="{thumb}"/><Directory ratingKey="2" title="B"/>'
+        elif path == "/library/metadata/1":
+            with self.lock:
+                self.checks += 1
+            body = f'<Directory ratingKey="1" title="A" thumb="{thumb}"/>'
+        else:
+            body = '<Directory ratingKey="2" title="B"/>'
+        return ET.fromstring(f"<MediaContainer>{body}</MediaContainer>")
+
+    def get_bytes(self, path, params=None):
+        with self.lock:
+            self.calls.append(path)
+        if path.endswith("/thumb/1"):
+            return b"----------------abc\r\nContent-Disposition: form-data"
+        return JPEG
+
+
+class TestDeferredVerification(unittest.TestCase):
+    def test_single_relist_then_retries_until_fixed(self):
+        client = FakePlex()
+        results = cli.verify_applied_posters(
+            client, "6", {"1": "/library/metadata/1/thumb/1", "2": ""}, retries=2, backoff=0, workers=2
+        )
+        self.assertEqual(results, {"1": ("fixed", ""), "2": ("failed_no_thumb", "")})
+        self.assertEqual(sum(1 for c in client.calls if c.endswith("/all")), 1)
+        self.assertNotIn("/library/metadata/1/thumb/1", client.calls)
+        self.assertEqual(client.calls.count("/library/metadata/1/thumb/2"), 1)
+
+    def test_unchanged_thumb_is_pending_until_retries_run_out(self):
+        client = FakePlex()
+        results = cli.verify_applied_posters(client, "6", {"1": "/library/metadata/1/thumb/1"}, retries=0, backoff=0)
+        self.assertEqual(results, {"1": ("failed_after_apply", "")})
+        self.assertEqual([c for c in client.calls if "/thumb/" in c], [])
+
+    def test_no_retry_artists_are_checked_once(self):
+        client = FakePlex()
+        results = cli.verify_applied_posters(client, "6", {"2": ""}, retries=3, backoff=0, no_retry={"2"})
+        self.assertEqual(results, {"2": ("failed_no_thumb", "")})
+        self.assertEqual(client.calls, ["/library/sections/6/all"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import xml.etree.ElementTree as ET
+
+from plex_music_hygiene.cli import ServiceState
+
+
+ARTISTS = [
+    ("1", "Various Artists", ""),
+    ("2", "V.A.", "/library/metadata/2/thumb/100"),
+    ("3", "The Beatles", "/library/metadata/3/thumb/100"),
+]
+
+
+class FakeClient:
+    api_format = "xml"
+
+    def __init__(self):
+        self.listings = 0
+        self.thumb_reads = 0
+
+    def get_xml(self, path, params=None):
+        if path.endswith("/all"):
+            self.listings += 1
+            body = "".join(f'<Directory ratingKey="{rk}" title="{t}" thumb="{th}"/>' for rk, t, th in ARTISTS)
+        elif path == "/library/metadata/2/children":
+            body = '<Directory ratingKey="20" title="Now 42"/>'
+        else:
+            body = '<Track ratingKey="200" title="Song"><Media><Part file="/Music/Now 42/01 - Song.flac"/></Media></Track>'
+        return ET.fromstring(f"<MediaContainer>{body}</MediaContainer>")
+
+    def get_bytes(self, path, params=None):
+        self.thumb_reads += 1
+        if "/2/" in path:
+            return b"----------------abc\r\nContent-Disposition: form-data" + b"\x00" * 64
+        return b"\xff\xd8\xff\xe0" + b"\x00" * 64
+
+
+class TestServiceState(unittest.TestCase):
+    def test_repeated_verify_reuses_listing_and_thumb_verdicts(self):
+        client = FakeClient()
+        state = ServiceState(client, "6", ttl=300)
+        first = state.handle("/verify", {})
+        second = state.handle("/verify", {})
+        self.assertEqual(first, second)
+        self.assertEqual([r[3] for r in first["rows"]], ["missing_thumb", "corrupt_thumb", "ok"])
+        self.assertEqual((client.listings, client.thumb_reads), (1, 2))
+
+    def test_expired_ttl_and_invalidate_refetch(self):
+        client = FakeClient()
+        state = ServiceState(client, "6", ttl=0)
+        state.artists()
+        state.artists()
+        self.assertEqual(client.listings, 2)
+        state.ttl = 300
+        state.handle("/verify", {})
+        state.handle("/invalidate", {})
+        state.handle("/verify", {})
+        self.assertEqual(client.thumb_reads, 4)
+
+    def test_export_matches_names_and_returns_track_rows(self):
+        state = ServiceState(FakeClient(), "6", ttl=300)
+        result = state.handle("/export", {"name": ["v.a."]})
+        self.assertEqual(result["found"], [("2", "V.A.")])
+        self.assertEqual(result["tracks"]["2"], [["20", "Now 42", "200", "Song", "/Music/Now 42/01 - Song.flac"]])
+        self.assertIsNone(state.handle("/nope", {}))
+
+    def test_requests_for_another_section_are_rejected(self):
+        client = FakeClient()
+        state = ServiceState(client, "6", ttl=300)
+        self.assertEqual(len(state.handle("/verify", {"section": ["6"]})["rows"]), 3)
+        with self.assertRaises(ValueError):
+            state.handle("/verify", {"section": ["7"]})
+        with self.assertRaises(ValueError):
+            state.handle("/export", {"section": ["7"], "name": ["v.a."]})
+        self.assertEqual(client.listings, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
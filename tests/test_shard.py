@@ -0,0 +1,46 @@
+import os
+import tempfile
+import unittest
+
+from plex_music_hygiene.cli import album_folder_key, in_shard, merge_summaries, parse_shard, read_summary
+
+
+class TestSharding(unittest.TestCase):
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for bad in ("0/4", "5/4", "1/0", "x", "1-4"):
+            with self.assertRaises(ValueError):
+                parse_shard(bad)
+
+    def test_every_key_lands_in_exactly_one_shard(self):
+        keys = [f"/Music/Album {i}" for i in range(200)]
+        for key in keys:
+            hits = [i for i in range(1, 5) if in_shard(key, (i, 4))]
+            self.assertEqual(len(hits), 1)
+        self.assertTrue(all(in_shard(k, None) for k in keys))
+
+    def test_tracks_of_one_album_share_a_key(self):
+        a = album_folder_key("/Music/Now 42/01 - A.flac")
+        b = album_folder_key("/Music/Now 42/02 - B.flac")
+        self.assertEqual(a, b)
+        self.assertEqual(album_folder_key("C:\\Music\\Now 42\\01 - A.flac"), "C:/Music/Now 42")
+
+    def test_merge_summaries_sums_counters(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = []
+            for i, text in enumerate(
+                [
+                    "shard=1/2\nartists_total=5\nmissing_thumb=2\nmissing_examples:\n  1 | A\n",
+                    "shard=2/2\nartists_total=7\nmissing_thumb=1\ncorrupt_thumb=3\n",
+                ]
+            ):
+                path = os.path.join(tmp, f"s{i}.txt")
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(text)
+                paths.append(path)
+            merged = merge_summaries(read_summary(p) for p in paths)
+        self.assertEqual(merged, {"artists_total": "12", "missing_thumb": "3", "corrupt_thumb": "3"})
+
+
+if __name__ == "__main__":
+    unittest.main()
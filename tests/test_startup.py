@@ -0,0 +1,92 @@
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Modules that only specific subcommands need; none of them may load for --help
+# or before doctor makes its first request.
+HEAVY_MODULES = {
+    "mutagen",
+    "urllib.request",
+    "http.client",
+    "xml.etree.ElementTree",
+    "sqlite3",
+    "csv",
+    "json",
+    "concurrent.futures",
+    "pathlib",
+    "PIL",
+}
+
+# Cumulative import budget for plex_music_hygiene.cli; override on slow runners.
+IMPORT_BUDGET_US = int(os.getenv("HF_STARTUP_BUDGET_MS", "150")) * 1000
+
+
+def _importtime(args):
+    """Run under ``-X importtime``; returns the result and ``[(name, depth, cumulative_us)]`` in report order."""
+    env = os.environ.copy()
+    env["PYTHONPATH"] = f"{ROOT / 'src'}" + (os.pathsep + env["PYTHONPATH"] if env.get("PYTHONPATH") else "")
+    env.pop("PLEX_TOKEN", None)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        stdin=subprocess.DEVNULL,
+    )
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _self, cumulative, name = line[len("import time:") :].split("|")
+        if cumulative.strip().isdigit():
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            imports.append((name.strip(), depth, int(cumulative)))
+    return result, imports
+
+
+def _before_first(imports, module):
+    """Imports reported before ``module`` started loading (its own dependencies excluded)."""
+    for pos, (name, depth, _us) in enumerate(imports):
+        if name == module:
+            start = pos
+            while start > 0 and imports[start - 1][1] > depth:
+                start -= 1
+            return imports[:start]
+    return None
+
+
+class TestStartup(unittest.TestCase):
+    def assertNoHeavyImports(self, imports):
+        loaded = sorted({m for m, _d, _us in imports if m in HEAVY_MODULES or m.split(".")[0] in HEAVY_MODULES})
+        self.assertEqual(loaded, [], "heavy modules imported at startup")
+
+    def test_help_imports_only_argparse_level_modules(self):
+        result, imports = _importtime(["-m", "plex_music_hygiene.cli", "--help"])
+        self.assertEqual(result.returncode, 0, result.stderr[-2000:])
+        self.assertNoHeavyImports(imports)
+
+    def test_doctor_cold_start_is_light_until_first_network_call(self):
+        # Unreachable server: doctor gets as far as its first request and fails fast.
+        args = ["--token", "x", "--base-url", "http://127.0.0.1:9", "--timeout", "1", "doctor"]
+        result, imports = _importtime(["-m", "plex_music_hygiene.cli", *args])
+        self.assertIn("cannot connect", result.stdout)
+        before = _before_first(imports, "urllib.request")
+        self.assertIsNotNone(before, "doctor never reached its first network call")
+        self.assertNoHeavyImports(before)
+        self.assertLess(sum(us for _m, depth, us in before if depth == 0), IMPORT_BUDGET_US)
+
+    def test_module_import_within_budget(self):
+        result, imports = _importtime(["-c", "import plex_music_hygiene.cli"])
+        self.assertEqual(result.returncode, 0, result.stderr[-2000:])
+        cumulative = {m: us for m, _d, us in imports}
+        self.assertLess(cumulative["plex_music_hygiene.cli"], IMPORT_BUDGET_US)
+
+
+if __name__ == "__main__":
+    unittest.main()
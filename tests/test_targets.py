@@ -0,0 +1,85 @@
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from plex_music_hygiene.cli import main, resolve_targets, run_targets
+
+
+def make_args(**overrides):
+    args = argparse.Namespace(
+        base_url="http://127.0.0.1:32400",
+        token="tok",
+        section="6",
+        target=[],
+        profiles="",
+        max_per_server=2,
+    )
+    for k, v in overrides.items():
+        setattr(args, k, v)
+    return args
+
+
+class TestTargets(unittest.TestCase):
+    def test_comma_separated_sections_without_profiles(self):
+        targets = resolve_targets(make_args(section="6, 7"))
+        self.assertEqual([label for label, _ns in targets], ["6", "7"])
+        self.assertEqual({ns.base_url for _label, ns in targets}, {"http://127.0.0.1:32400"})
+
+    def test_profiles_supply_connection_and_sections(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "profiles.ini")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("[home]\nbase_url = http://home:32400\ntoken = a%b\nsections = 1,2\nmax_concurrency = 1\n")
+                f.write("[office]\nbase_url = http://office:32400\ntoken = c\n")
+            targets = resolve_targets(make_args(target=["home", "office"], profiles=path, section="9"))
+            with self.assertRaises(SystemExit):
+                resolve_targets(make_args(target=["nope"], profiles=path))
+        self.assertEqual([label for label, _ns in targets], ["home:1", "home:2", "office:9"])
+        home = targets[0][1]
+        self.assertEqual((home.base_url, home.token, home.max_per_server), ("http://home:32400", "a%b", 1))
+
+    def test_profile_without_base_url_is_rejected(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "profiles.ini")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("[home]\ntoken = a\n")
+            with self.assertRaises(SystemExit) as ctx:
+                resolve_targets(make_args(target=["home"], profiles=path))
+        self.assertIn("base_url", str(ctx.exception))
+
+    def test_section_lists_only_for_fan_out_commands(self):
+        argv = ["plexh", "--token", "x", "--section", "6,7", "export-artist-tracks", "--out-csv", "x.csv"]
+        with mock.patch.object(sys, "argv", argv):
+            with self.assertRaises(SystemExit) as ctx:
+                main()
+        self.assertIn("single --section", str(ctx.exception))
+
+    def test_run_targets_limits_per_server_and_keeps_failures_separate(self):
+        targets = resolve_targets(make_args(section="1,2,3", max_per_server=1))
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def job(ns):
+            with lock:
+                active.append(ns.section)
+                peak.append(len(active))
+            time.sleep(0.02)
+            with lock:
+                active.remove(ns.section)
+            if ns.section == "2":
+                raise OSError("boom")
+            return ns.section
+
+        results = run_targets(targets, job)
+        self.assertEqual(max(peak), 1)
+        self.assertEqual(results, [("1", "1", ""), ("2", None, "boom"), ("3", "3", "")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import argparse
+import io
+import os
+import tempfile
+import unittest
+from contextlib import ExitStack, redirect_stdout
+from unittest import mock
+
+from plex_music_hygiene import cli
+from plex_music_hygiene.cli import Debouncer, PollingWatcher, reverse_maps, apply_maps
+
+
+class TestWatchHelpers(unittest.TestCase):
+    def test_debouncer_releases_only_quiet_keys(self):
+        d = Debouncer(5)
+        d.add("a", 0)
+        d.add("b", 3)
+        d.add("a", 4)
+        self.assertEqual(d.pop_ready(8), ["b"])
+        self.assertEqual(d.pop_ready(9), ["a"])
+        self.assertEqual(len(d), 0)
+
+    def test_polling_watcher_reports_new_and_modified_audio_only(self):
+        with tempfile.TemporaryDirectory() as root:
+            existing = os.path.join(root, "01 - Old.flac")
+            with open(existing, "wb") as f:
+                f.write(b"a")
+            watcher = PollingWatcher([root], interval=0)
+            os.makedirs(os.path.join(root, "Album"))
+            added = os.path.join(root, "Album", "02 - New.mp3")
+            with open(added, "wb") as f:
+                f.write(b"b")
+            with open(os.path.join(root, "Album", "cover.jpg"), "wb") as f:
+                f.write(b"c")
+            with open(existing, "ab") as f:
+                f.write(b"more")
+            self.assertEqual(sorted(watcher.read(timeout=0)), sorted([existing, added]))
+            self.assertEqual(watcher.read(timeout=0), [])
+
+    def test_polling_watcher_waits_for_interval_before_rescanning(self):
+        with tempfile.TemporaryDirectory() as root:
+            watcher = PollingWatcher([root], interval=30)
+            scans = []
+            watcher._scan = lambda: scans.append(1) or {}
+            for _ in range(3):
+                self.assertEqual(watcher.read(timeout=0.01), [])
+            self.assertEqual(scans, [])
+            watcher.last_scan -= 30
+            watcher.read(timeout=0.01)
+            self.assertEqual(len(scans), 1)
+
+    def test_reverse_maps_turn_host_folders_into_plex_paths(self):
+        maps = [("/Music", "/mnt/nas/music")]
+        self.assertEqual(apply_maps("/mnt/nas/music/Now 42", reverse_maps(maps)), "/Music/Now 42")
+
+
+class FakeWatcher:
+    def __init__(self, paths):
+        self.paths = paths
+
+    def read(self, timeout):
+        paths, self.paths = self.paths, []
+        return paths
+
+    def close(self):
+        pass
+
+
+class TestCmdWatch(unittest.TestCase):
+    def run_watch(self, status, **overrides):
+        with tempfile.TemporaryDirectory() as root:
+            folder = os.path.join(root, "Now 42")
+            os.mkdir(folder)
+            path = os.path.join(folder, "01 - A.flac")
+            with open(path, "wb") as f:
+                f.write(b"a")
+
+            def fake_fix(host, expected, fixers, dry_run):
+                if status == "updated":
+                    os.remove(host)  # renamed away right after the save
+                return [host, status, expected, "", "", "", "", "", ""]
+
+            args = argparse.Namespace(
+                fixers="album",
+                path_map=[],
+                root=[root],
+                no_refresh=False,
+                dry_run=False,
+                server="plex",
+                token="t",
+                section="6",
+                poll=True,
+                poll_interval=0,
+                debounce_seconds=0,
+                refresh_delay=0,
+                run_seconds=0.3,
+                out_csv=os.path.join(root, "watch.csv"),
+            )
+            for k, v in overrides.items():
+                setattr(args, k, v)
+            client = mock.Mock()
+            with ExitStack() as stack:
+                stack.enter_context(mock.patch.object(cli, "mutagen_file", return_value=object()))
+                stack.enter_context(mock.patch.object(cli, "make_watcher", return_value=FakeWatcher([path])))
+                make_client = stack.enter_context(mock.patch.object(cli, "make_client", return_value=client))
+                stack.enter_context(mock.patch.object(cli, "fix_tag_file", side_effect=fake_fix))
+                out = stack.enter_context(redirect_stdout(io.StringIO()))
+                cli.cmd_watch(args)
+        return make_client, client, out.getvalue()
+
+    def test_dry_run_never_contacts_plex(self):
+        make_client, client, out = self.run_watch("would_update", dry_run=True, token="")
+        make_client.assert_not_called()
+        client.get.assert_not_called()
+        self.assertIn("would_update=1", out)
+        self.assertNotIn("refreshed", out)
+
+    def test_file_vanishing_after_save_does_not_stop_the_watcher(self):
+        _make_client, client, out = self.run_watch("updated")
+        self.assertIn("updated=1", out)
+        client.get.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()